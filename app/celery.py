@@ -1,10 +1,17 @@
+import logging
 import os
+import threading
+import time
 
-from celery import Celery
+from celery import Celery, Task
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
+from core import metrics  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
 app = Celery('api_celery')
 
 # Using a string here means the worker doesn't have to serialize
@@ -15,3 +22,112 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+# Record queue wait, runtime and outcome of every task.
+metrics.connect()
+
+
+class BatchFailed(Exception):
+    """
+    Raised by a batch task function when only some of its items failed.
+    """
+
+    def __init__(self, items):
+        super().__init__(f'{len(items)} items failed')
+        self.items = items
+
+
+class Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.failed = []
+        self.error = None
+
+
+class BatchTask(Task):
+    """
+    A task that is published with one item but runs on many.
+
+    The decorated function takes a list of items. In a worker, concurrent
+    calls join a per-process batch, which runs when it holds `batch_size`
+    items or `batch_window` seconds after its first item, whichever comes
+    first. Direct and eager calls run their item right away.
+
+    Every call waits for its batch, and messages are acknowledged late, so
+    an item is only acknowledged once it has been run. Items of a batch
+    that raised, or that the function listed in BatchFailed, are retried.
+    Batches only form when the worker runs calls concurrently, e.g. with
+    the threads pool and a concurrency of at least `batch_size`.
+    """
+    acks_late = True
+    reject_on_worker_lost = True
+    batch_size = 100
+    batch_window = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._batch = None
+
+    def __call__(self, item):
+        request = self.request
+        if request.called_directly or request.is_eager:
+            return super().__call__([item])
+
+        batch, first = self.join(item)
+        if first:
+            # The first call runs the batch for all of them.
+            batch.full.wait(self.batch_window)
+            self.run_batch(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None or item in batch.failed:
+            raise self.retry(exc=batch.error)
+
+    def join(self, item):
+        """
+        Add `item` to the open batch and return it, and whether `item` is
+        its first.
+        """
+        with self._lock:
+            batch = self._batch
+            first = batch is None
+            if first:
+                batch = self._batch = Batch()
+
+            batch.items.append(item)
+            if len(batch.items) >= self.batch_size:
+                self._batch = None
+                batch.full.set()
+
+        return batch, first
+
+    def run_batch(self, batch):
+        with self._lock:
+            # Later calls start a new batch.
+            if self._batch is batch:
+                self._batch = None
+
+        started = time.monotonic()
+        try:
+            self.run(batch.items)
+        except BatchFailed as exc:
+            batch.failed = exc.items
+        except Exception as exc:
+            logger.exception(
+                '%s failed for %d items',
+                self.name,
+                len(batch.items),
+            )
+            batch.error = exc
+        finally:
+            batch.done.set()
+
+        metrics.metrics.batch(
+            self.name,
+            time.monotonic() - started,
+            failed=batch.error is not None or bool(batch.failed),
+        )
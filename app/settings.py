@@ -42,7 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'core',
@@ -54,11 +54,24 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# The toolbar middleware is sync only. Under ASGI it would run every request,
+# the async views in core/asyncviews.py included, in a thread, so ASGI servers
+# turn the toolbar off.
+DEBUG_TOOLBAR = os.environ.get('DEBUG_TOOLBAR', 'on') == 'on'
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS.insert(
+        INSTALLED_APPS.index('rest_framework'),
+        'debug_toolbar',
+    )
+    index = MIDDLEWARE.index(
+        'django.contrib.messages.middleware.MessageMiddleware',
+    )
+    MIDDLEWARE.insert(index, 'debug_toolbar.middleware.DebugToolbarMiddleware')
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -113,6 +126,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing runs in a process pool with this many slots per worker.
+# Keep it below the gunicorn thread count so hashing can't take every thread.
+PASSWORD_HASHING_CONCURRENCY = int(
+    os.environ.get('PASSWORD_HASHING_CONCURRENCY', 2),
+)
+PASSWORD_HASHING_PROCESSES = True
+# Seconds to wait for a hashing slot before answering with a 503.
+PASSWORD_HASHING_QUEUE_TIMEOUT = 2
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
@@ -141,12 +163,28 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',  # noqa
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.BasicAuthentication',
+        'core.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'core.authentication.TokenAuthentication',
     ],
 }
 
+# Unfiltered listings of tables with more rows than this report the planner's
+# row estimate as their count instead of running COUNT(*).
+PAGINATION_EXACT_COUNT_THRESHOLD = 100000
+
+# Rows fetched per round trip by the server side cursor of user exports.
+EXPORT_CHUNK_SIZE = 2000
+
+# Most rows a single bulk create request may have. Every password is hashed
+# within the request, about 0.1s each on PASSWORD_HASHING_CONCURRENCY slots,
+# so this keeps a request well inside gunicorn's 30 second timeout. Larger
+# imports are sent as several requests.
+BULK_CREATE_MAX_ROWS = 200
+
+# Most ids a single bulk update change set may list.
+BULK_UPDATE_MAX_IDS = 10000
+
 DOMAIN = os.environ['DOMAIN']
 
 # Email Config
@@ -154,6 +192,15 @@ EMAIL_BACKEND = os.environ['EMAIL_BACKEND']
 EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH')
 DEFAULT_FROM_EMAIL = DOMAIN
 
+# Verification emails are sent over one connection in batches of up to
+# EMAIL_BATCH_SIZE, at most EMAIL_BATCH_WINDOW seconds after the first one.
+EMAIL_BATCH_SIZE = 50
+EMAIL_BATCH_WINDOW = 1.0
+
+# Repeated requests for a verification email within this many seconds of the
+# first one don't send another.
+EMAIL_VERIFICATION_DEDUPE_WINDOW = 60
+
 
 # Django Toolbar
 def show_toolbar(request):
@@ -176,7 +223,45 @@ CACHES = {
     }
 }
 
+# Seconds a Bearer token -> user snapshot stays in the cache.
+TOKEN_CACHE_TIMEOUT = 300
+
+# Verified basic auth credentials are remembered for this many seconds. Each
+# process keeps up to CREDENTIAL_CACHE_SIZE of them in memory.
+CREDENTIAL_CACHE_TIMEOUT = 300
+CREDENTIAL_CACHE_SIZE = 1024
+
+# Seconds a signed access token issued by /login/ stays valid.
+ACCESS_TOKEN_LIFETIME = 300
+
+# Seconds a rendered GET /users/{id}/ response stays in the cache. Writes to
+# the user make cached responses unreachable right away.
+USER_DETAIL_CACHE_TIMEOUT = 600
+
+# Tasks queued in the outbox are published in batches of OUTBOX_BATCH_SIZE,
+# every OUTBOX_DRAIN_INTERVAL seconds.
+OUTBOX_BATCH_SIZE = 500
+OUTBOX_DRAIN_INTERVAL = 1.0
+
+# Celery processes write their task metrics to this directory, at most every
+# TASK_METRICS_WRITE_INTERVAL seconds. Read them with ./manage.py task_metrics.
+TASK_METRICS_DIR = os.environ.get('TASK_METRICS_DIR')
+TASK_METRICS_WRITE_INTERVAL = 10
+
 # Celery
 CELERY_BROKER_URL = 'amqp://rabbitmq'
 CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_DEFAULT_QUEUE = 'default'
+# Batch tasks need a worker that runs many calls at once, see
+# scripts/run-celery-batch.sh.
+CELERY_TASK_ROUTES = {
+    'core.tasks.send_verification_email': {'queue': 'batch'},
+}
+CELERY_BEAT_SCHEDULE = {
+    'drain-outbox': {
+        'task': 'core.tasks.drain_outbox',
+        'schedule': OUTBOX_DRAIN_INTERVAL,
+        # A late drain is replaced by the next one.
+        'options': {'expires': OUTBOX_DRAIN_INTERVAL},
+    },
+}
@@ -1,19 +1,29 @@
-import debug_toolbar
+from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 from rest_framework import routers
 from rest_framework.schemas import get_schema_view
 
-from core import views
+from core import asyncviews, views
 
 router = routers.DefaultRouter()
 router.register('users', views.UserViewSet)
 router.register('countries', views.CountryViewSet, basename='countries')
 
+# Async read endpoints for ASGI servers, see core/asyncviews.py.
+async_urlpatterns = [
+    path('users/', asyncviews.user_list),
+    path('users/<str:pk>/', asyncviews.user_detail),
+    path('countries/', asyncviews.country_list),
+    path('countries/<str:pk>/', asyncviews.country_detail),
+]
+
 urlpatterns = [
     path('login/', views.ObtainAuthToken.as_view()),
+    path('login/refresh/', views.RefreshAccessToken.as_view()),
     path('', include(router.urls)),
+    path('async/', include(async_urlpatterns)),
     path(
         'api-auth/',
         include('rest_framework.urls', namespace='rest_framework'),
@@ -28,5 +38,9 @@ urlpatterns = [
         template_name='docs/swagger-ui.html',
         extra_context={'schema_url': 'openapi-schema'}
     ), name='docs'),
-    path('__debug__/', include(debug_toolbar.urls)),
 ]
+
+if settings.DEBUG_TOOLBAR:
+    import debug_toolbar
+
+    urlpatterns.append(path('__debug__/', include(debug_toolbar.urls)))
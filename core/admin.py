@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import EmailVerification, User
+from .models import EmailVerification, OutboxMessage, User
 
 admin.site.register(EmailVerification)
+admin.site.register(OutboxMessage)
 admin.site.register(User)
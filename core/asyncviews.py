@@ -0,0 +1,140 @@
+"""
+Async versions of the read endpoints, served under `/async/` by ASGI
+servers.
+
+Django 3.2 has no async ORM and DRF views are sync only, and under ASGI
+every sync view of a process runs in one shared thread. These views answer
+what they can without it: bearer tokens are checked against their signed
+claims or the token cache, countries come from memory and user details from
+the response cache. Cache clients block, so their calls run in a thread pool
+instead of on the event loop. Anything else, including everything that needs
+the DB, is handed to the regular DRF view in the sync thread.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+
+from core import views
+from core.authentication import TokenAuthentication
+from core.models import COUNTRIES, SIGNUP_USER
+from core.responses import user_detail_cache, user_detail_variant
+from core.serializers import UserAdminSerializer, UserSerializer
+
+# Accept headers DRF answers with the JSON renderer.
+JSON_ACCEPT = {'', '*/*', 'application/json'}
+DETAIL_PARAMS = {'fields', 'exclude'}
+
+authenticator = TokenAuthentication()
+
+user_list_view = views.UserViewSet.as_view({'get': 'list'})
+user_detail_view = views.UserViewSet.as_view({'get': 'retrieve'})
+country_list_view = views.CountryViewSet.as_view({'get': 'list'})
+country_detail_view = views.CountryViewSet.as_view({'get': 'retrieve'})
+
+
+# Cache lookups don't touch the DB, so they needn't wait for the sync thread.
+@sync_to_async(thread_sensitive=False)
+def cached_credentials(key):
+    return authenticator.cached_credentials(key)
+
+
+@sync_to_async(thread_sensitive=False)
+def cached_user_detail(pk, variant):
+    body, _ = user_detail_cache.get(pk, variant, record_miss=False)
+    return body
+
+
+async def cached_auth(request):
+    """
+    Return `(user, token)` for a GET with a bearer token that can be checked
+    without the DB, otherwise None. Failures return None too, the DRF view
+    reports them.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(header) != 2 or header[0] != authenticator.keyword:
+        return None
+
+    try:
+        return await cached_credentials(header[1])
+    except exceptions.AuthenticationFailed:
+        return None
+
+
+def accepts_json(request):
+    return request.META.get('HTTP_ACCEPT', '') in JSON_ACCEPT
+
+
+async def delegate(view, request, auth=None, **kwargs):
+    if auth is not None:
+        # DRF uses a user forced onto the request instead of authenticating
+        # it again.
+        request._force_auth_user, request._force_auth_token = auth
+
+    return await sync_to_async(view)(request, **kwargs)
+
+
+async def user_list(request):
+    auth = await cached_auth(request)
+    if auth is not None and auth[0].email == SIGNUP_USER:
+        auth = None
+
+    return await delegate(user_list_view, request, auth)
+
+
+async def user_detail(request, pk):
+    auth = await cached_auth(request)
+    if auth is None:
+        return await delegate(user_detail_view, request, pk=pk)
+
+    user = auth[0]
+    cacheable = (
+        user.email != SIGNUP_USER and
+        accepts_json(request) and
+        set(request.GET) <= DETAIL_PARAMS and
+        pk.isdigit() and
+        (user.is_staff or user.id == int(pk))
+    )
+    if cacheable:
+        if user.is_staff:
+            serializer_class = UserAdminSerializer
+        else:
+            serializer_class = UserSerializer
+
+        variant = user_detail_variant(
+            serializer_class,
+            'application/json',
+            request,
+        )
+        body = await cached_user_detail(int(pk), variant)
+        if body is not None:
+            return HttpResponse(body, content_type='application/json')
+
+    return await delegate(user_detail_view, request, auth, pk=pk)
+
+
+async def country_list(request):
+    auth = await cached_auth(request)
+    if auth is None:
+        return await delegate(country_list_view, request)
+
+    query = request.GET.get('q', '').strip().lower()
+    if query:
+        return views.country_search(query).as_response(request)
+
+    return views.country_list().as_response(request)
+
+
+async def country_detail(request, pk):
+    auth = await cached_auth(request)
+    country = COUNTRIES.get(pk)
+    if auth is None or country is None or not accepts_json(request):
+        return await delegate(country_detail_view, request, auth, pk=pk)
+
+    return HttpResponse(
+        JSONRenderer().render(views.serialize_country(country)),
+        content_type='application/json',
+    )
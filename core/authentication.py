@@ -1,5 +1,172 @@
-from rest_framework import authentication
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+from rest_framework.authtoken.models import Token
+
+from core.cache import CacheStats, LRUCache
+from core.models import User
+from core.tokens import is_access_token, read_access_token
+
+# Fields kept in the cached user snapshot. Anything else is deferred and
+# loaded from the DB on first access.
+USER_SNAPSHOT_FIELDS = [
+    f.attname for f in User._meta.concrete_fields
+    if f.attname in {
+        'id',
+        'username',
+        'email',
+        'first_name',
+        'last_name',
+        'is_active',
+        'is_staff',
+        'is_superuser',
+    }
+]
+
+token_stats = CacheStats('token')
+credential_stats = CacheStats('credentials')
+
+# Digests of recently verified basic auth credentials, mapped to user ids.
+verified_credentials = LRUCache(
+    settings.CREDENTIAL_CACHE_SIZE,
+    settings.CREDENTIAL_CACHE_TIMEOUT,
+)
+
+
+def token_cache_key(key):
+    return f'auth:token:{key}'
+
+
+def forget_token(key):
+    cache.delete(token_cache_key(key))
+
+
+def forget_user_tokens(user_ids):
+    keys = Token.objects.filter(user_id__in=user_ids).values_list(
+        'key',
+        flat=True,
+    )
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def credential_digest(user, password):
+    # The password hash is part of the message, so changing the password
+    # makes every digest computed for the old one unreachable.
+    value = f'{user.id}:{user.password}:{password}'
+    return salted_hmac(
+        'core.authentication.credentials',
+        value,
+        algorithm='sha256',
+    ).hexdigest()
+
+
+def credential_cache_key(digest):
+    return f'auth:credentials:{digest}'
+
+
+def remember_credentials(user, password):
+    digest = credential_digest(user, password)
+    verified_credentials.set(digest, user.id)
+    cache.set(
+        credential_cache_key(digest),
+        user.id,
+        settings.CREDENTIAL_CACHE_TIMEOUT,
+    )
+
+
+def credentials_verified(user, password):
+    digest = credential_digest(user, password)
+    if verified_credentials.get(digest) == user.id:
+        return True
+
+    if cache.get(credential_cache_key(digest)) == user.id:
+        verified_credentials.set(digest, user.id)
+        return True
+
+    return False
+
+
+def forget_credentials(user_ids):
+    # Entries in memcached can't be found without the password, they are
+    # unreachable once the hash changes and expire on their own.
+    verified_credentials.delete_values(user_ids)
+
+
+class BasicAuthentication(authentication.BasicAuthentication):
+    """
+    Basic authentication that skips the password hash for credentials it has
+    verified recently.
+    """
+
+    def authenticate_credentials(self, userid, password, request=None):
+        try:
+            user = User._default_manager.get_by_natural_key(userid)
+        except User.DoesNotExist:
+            user = None
+
+        if user is not None and credentials_verified(user, password):
+            credential_stats.hit()
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed(
+                    _('User inactive or deleted.'),
+                )
+
+            return user, None
+
+        credential_stats.miss()
+        user, auth = super().authenticate_credentials(
+            userid,
+            password,
+            request,
+        )
+        remember_credentials(user, password)
+        return user, auth
 
 
 class TokenAuthentication(authentication.TokenAuthentication):
     keyword = 'Bearer'
+
+    def authenticate_credentials(self, key):
+        result = self.cached_credentials(key)
+        if result is not None:
+            return result
+
+        token_stats.miss()
+        user, token = super().authenticate_credentials(key)
+        snapshot = [getattr(user, name) for name in USER_SNAPSHOT_FIELDS]
+        cache.set(token_cache_key(key), snapshot, settings.TOKEN_CACHE_TIMEOUT)
+        return user, token
+
+    def cached_credentials(self, key):
+        """
+        Return `(user, token)` without querying the DB, or None if the DB
+        token isn't cached. Signed access tokens never need the DB.
+        """
+        if is_access_token(key):
+            result = read_access_token(key)
+            if result is None:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            return result
+
+        snapshot = cache.get(token_cache_key(key))
+        if snapshot is None:
+            return None
+
+        token_stats.hit()
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_SNAPSHOT_FIELDS, snapshot)
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.'),
+            )
+
+        token = self.get_model().from_db(
+            DEFAULT_DB_ALIAS,
+            ['key', 'user_id'],
+            [key, user.id],
+        )
+        token.user = user
+        return user, token
@@ -0,0 +1,162 @@
+import functools
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from core import hashing, outbox
+from core.models import User
+from core.serializers import BulkSignupSerializer
+from core.signals import users_updated
+from core.tasks import send_verification_emails
+
+DUPLICATE_EMAIL = {'email': ['user with this email already exists.']}
+
+
+def fail(result, errors):
+    result.pop('id', None)
+    result.update(status='failed', errors=errors)
+
+
+def create_users(rows):
+    """
+    Create users from a list of signup dicts.
+
+    The rows are validated, checked for existing emails with one query,
+    hashed on the hashing pool, inserted with `bulk_create` and get a single
+    verification email task. Returns a result per row, in input order.
+    """
+    results = []
+    valid = []
+    for i, row in enumerate(rows):
+        result = dict(row=i, status='created', id=None)
+        results.append(result)
+
+        serializer = BulkSignupSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((result, serializer.validated_data))
+        else:
+            fail(result, serializer.errors)
+
+    emails = [data['email'] for _, data in valid]
+    existing = set(
+        User.objects.filter(email__in=emails).values_list('email', flat=True)
+    )
+
+    pending = []
+    seen = set()
+    for result, data in valid:
+        if data['email'] in existing or data['email'] in seen:
+            fail(result, DUPLICATE_EMAIL)
+        else:
+            seen.add(data['email'])
+            pending.append((result, data))
+
+    passwords = hashing.make_passwords(data['password'] for _, data in pending)
+    users = [
+        User(
+            username=data['email'],
+            email=data['email'],
+            first_name=data.get('first_name', ''),
+            last_name=data.get('last_name', ''),
+            password=password,
+        )
+        for (_, data), password in zip(pending, passwords)
+    ]
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            queue_verification_emails(users)
+    except IntegrityError:
+        # Another request created one of the emails after the check above.
+        with transaction.atomic():
+            users = [save_or_none(user) for user in users]
+            queue_verification_emails(users)
+
+    for (result, _), user in zip(pending, users):
+        if user is None:
+            fail(result, DUPLICATE_EMAIL)
+        else:
+            result['id'] = user.id
+
+    return results
+
+
+def queue_verification_emails(users):
+    ids = [user.id for user in users if user is not None]
+    if ids:
+        outbox.enqueue(send_verification_emails, ids)
+
+
+def save_or_none(user):
+    try:
+        with transaction.atomic():
+            user.save()
+    except IntegrityError:
+        return None
+
+    return user
+
+
+def filter_users(queryset, target):
+    lookups = {}
+    if 'ids' in target:
+        lookups['id__in'] = target['ids']
+    if 'is_staff' in target:
+        lookups['is_staff'] = target['is_staff']
+    if 'is_active' in target:
+        lookups['is_active'] = target['is_active']
+    if 'joined_after' in target:
+        lookups['date_joined__gte'] = target['joined_after']
+    if 'joined_before' in target:
+        lookups['date_joined__lt'] = target['joined_before']
+
+    return queryset.filter(**lookups)
+
+
+def update_users(queryset, changes):
+    """
+    Apply `(target, values)` change sets to the users of `queryset` with one
+    UPDATE each, in a single transaction. Returns the number of users every
+    change set updated.
+
+    A change set may select at most `BULK_UPDATE_MAX_IDS` users, by ids or
+    by filters. If one selects more, ValidationError is raised and nothing
+    is updated.
+
+    `update()` doesn't send post_save, so `users_updated` is sent for each
+    change set once the transaction commits.
+    """
+    limit = settings.BULK_UPDATE_MAX_IDS
+    counts = []
+    with transaction.atomic():
+        for number, (target, values) in enumerate(changes):
+            values = dict(values)
+            # The selected rows stay locked until the UPDATE, so it changes
+            # exactly these users.
+            users = filter_users(queryset, target).order_by()
+            users = users.select_for_update().values_list('id', flat=True)
+            ids = list(users[:limit + 1])
+            if len(ids) > limit:
+                raise ValidationError(
+                    f'Change set {number} selects more than {limit} users.',
+                )
+
+            if not ids:
+                counts.append(0)
+                continue
+
+            if 'password' in values:
+                # One hash for the whole change set.
+                values['password'] = hashing.make_password(values['password'])
+
+            counts.append(User.objects.filter(id__in=ids).update(**values))
+            transaction.on_commit(functools.partial(
+                users_updated.send,
+                sender=User,
+                user_ids=ids,
+                fields=list(values),
+            ))
+
+    return counts
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+STATS = {}
+
+
+class CacheStats:
+    """
+    Hit/miss counters for a named cache.
+
+    Counts are buffered in the process and pushed to the shared cache every
+    `flush_every` events, so recording a hit does not cost a round trip.
+    """
+
+    def __init__(self, name, flush_every=100):
+        self.name = name
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._pending = self._empty()
+        STATS[name] = self
+
+    def _empty(self):
+        return {'hits': 0, 'misses': 0}
+
+    def _key(self, kind):
+        return f'stats:{self.name}:{kind}'
+
+    def hit(self):
+        self._record('hits')
+
+    def miss(self):
+        self._record('misses')
+
+    def _record(self, kind):
+        with self._lock:
+            self._pending[kind] += 1
+            if sum(self._pending.values()) < self.flush_every:
+                return
+
+            pending, self._pending = self._pending, self._empty()
+
+        self._push(pending)
+
+    def _push(self, pending):
+        for kind, count in pending.items():
+            if not count:
+                continue
+
+            key = self._key(kind)
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # The key was evicted between add and incr.
+                cache.set(key, count, timeout=None)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, self._empty()
+
+        self._push(pending)
+
+    def get(self):
+        self.flush()
+        hits = cache.get(self._key('hits'), 0)
+        misses = cache.get(self._key('misses'), 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'ratio': hits / total if total else 0.0,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._pending = self._empty()
+
+        cache.delete_many([self._key('hits'), self._key('misses')])
+
+
+class LRUCache:
+    """
+    A thread-safe, in-process LRU mapping. Entries expire `timeout` seconds
+    after they are set.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete_values(self, values):
+        values = set(values)
+        with self._lock:
+            keys = [k for k, (v, _) in self._data.items() if v in values]
+            for key in keys:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,142 @@
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Sequence
+
+
+class Country:
+    __slots__ = ('code', 'alpha_3', 'name')
+
+    def __init__(self, code, alpha_3, name):
+        self.code = code
+        self.alpha_3 = alpha_3
+        self.name = name
+
+    def __repr__(self):
+        return f'<Country {self.code} {self.name}>'
+
+
+class CountryRegistry(Sequence):
+    """
+    The countries known to pycountry, sorted by name.
+
+    pycountry is imported and its database loaded on first access, so
+    processes that never look at countries don't pay for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._countries = None
+        self._index = None
+        self._prefixes = None
+        self._haystacks = None
+
+    @property
+    def loaded(self):
+        return self._countries is not None
+
+    def _load(self):
+        with self._lock:
+            if self._countries is not None:
+                return
+
+            import pycountry
+
+            countries = [
+                Country(c.alpha_2, c.alpha_3, c.name)
+                for c in pycountry.countries
+            ]
+            countries.sort(key=lambda c: c.name)
+
+            index = {}
+            for i, country in enumerate(countries):
+                index[country.code] = i
+                index[country.alpha_3] = i
+
+            self._index = index
+            self._countries = countries
+
+    @property
+    def countries(self):
+        if self._countries is None:
+            self._load()
+
+        return self._countries
+
+    def __getitem__(self, i):
+        return self.countries[i]
+
+    def __len__(self):
+        return len(self.countries)
+
+    def __iter__(self):
+        return iter(self.countries)
+
+    def index_of(self, code):
+        """
+        Return the position of the country with the given alpha-2 or alpha-3
+        code, or None.
+        """
+        if self._countries is None:
+            self._load()
+
+        return self._index.get(code.upper())
+
+    def get(self, code):
+        i = self.index_of(code)
+        return None if i is None else self._countries[i]
+
+    def _build_search_index(self):
+        countries = self.countries
+        with self._lock:
+            if self._prefixes is not None:
+                return
+
+            prefixes = defaultdict(list)
+            haystacks = []
+            for i, country in enumerate(countries):
+                name = country.name.lower()
+                code = country.code.lower()
+                alpha_3 = country.alpha_3.lower()
+                terms = {name, code, alpha_3, *re.findall(r'\w+', name)}
+
+                keys = set()
+                for term in terms:
+                    for end in range(1, len(term) + 1):
+                        keys.add(term[:end])
+
+                for key in keys:
+                    prefixes[key].append(i)
+
+                haystacks.append(f'{name}\n{code}\n{alpha_3}')
+
+            self._haystacks = haystacks
+            self._prefixes = {
+                key: tuple(indexes) for key, indexes in prefixes.items()
+            }
+
+    def search(self, query):
+        """
+        Return countries whose name, a word of the name, or a code starts with
+        `query`, followed by the ones that only contain it.
+        """
+        query = query.strip().lower()
+        if not query:
+            return list(self)
+
+        if self._prefixes is None:
+            self._build_search_index()
+
+        prefixed = self._prefixes.get(query, ())
+        matched = set(prefixed)
+        contained = [
+            i for i, haystack in enumerate(self._haystacks)
+            if i not in matched and query in haystack
+        ]
+        return [self._countries[i] for i in (*prefixed, *contained)]
+
+    def choices(self):
+        return [(country.code, country.name) for country in self]
+
+
+registry = CountryRegistry()
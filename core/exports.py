@@ -0,0 +1,52 @@
+import csv
+import datetime
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Rows are joined into chunks of this size before they are handed to the
+# server, so it doesn't write one tiny chunk per row.
+ROWS_PER_CHUNK = 500
+
+
+def batched(rows, size=ROWS_PER_CHUNK):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def stream_ndjson(fields, rows):
+    encode = DjangoJSONEncoder(separators=(',', ':')).encode
+    for batch in batched(rows):
+        yield ''.join(encode(dict(zip(fields, row))) + '\n' for row in batch)
+
+
+def format_csv_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+
+    return value
+
+
+def stream_csv(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(fields)
+    yield flush()
+
+    for batch in batched(rows):
+        writer.writerows(map(format_csv_value, row) for row in batch)
+        yield flush()
@@ -0,0 +1,84 @@
+import operator
+from functools import reduce
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import CharField, Lookup, Q
+from django.db.models.functions import Greatest
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+# Trigram indexes can't narrow down shorter terms, a search needs at least
+# one term this long.
+MIN_TERM_LENGTH = 3
+
+
+@CharField.register_lookup
+class ILike(Lookup):
+    """
+    `field__ilike=pattern` compiles to `field ILIKE pattern` on Postgres,
+    which a `gin_trgm_ops` index on the column serves. Django's `icontains`
+    compares `UPPER(field)` instead and can't use it.
+    """
+    lookup_name = 'ilike'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} LIKE {rhs} ESCAPE '\\'", lhs_params + rhs_params
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', lhs_params + rhs_params
+
+
+def contains_pattern(term):
+    for char in ('\\', '%', '_'):
+        term = term.replace(char, f'\\{char}')
+
+    return f'%{term}%'
+
+
+class TrigramSearchFilter(filters.SearchFilter):
+    """
+    `?search=` over the view's `search_fields`. Every term has to be
+    contained in one of the fields, and the results are ordered by their
+    best trigram similarity to the whole query.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+
+        # Short terms are matched too, the index narrows the rows down by
+        # the longer ones.
+        if all(len(term) < MIN_TERM_LENGTH for term in terms):
+            raise ValidationError({
+                self.search_param: [
+                    f'Search for at least {MIN_TERM_LENGTH} characters.',
+                ],
+            })
+
+        for term in terms:
+            pattern = contains_pattern(term)
+            queryset = queryset.filter(reduce(operator.or_, [
+                Q(**{f'{field}__ilike': pattern}) for field in search_fields
+            ]))
+
+        query = ' '.join(self.get_search_terms(request))
+        similarities = [
+            TrigramSimilarity(field, query) for field in search_fields
+        ]
+        if len(similarities) > 1:
+            rank = Greatest(*similarities)
+        else:
+            rank = similarities[0]
+
+        ordering = queryset.query.order_by
+        return queryset.annotate(**{self.rank_annotation: rank}).order_by(
+            f'-{self.rank_annotation}',
+            *ordering,
+        )
@@ -0,0 +1,207 @@
+"""
+Password hashing with bounded concurrency.
+
+PBKDF2 holds the calling thread for tens of milliseconds. Every hash goes
+through a per-process pool of `PASSWORD_HASHING_CONCURRENCY` slots so a burst
+of signups or logins can't occupy every worker thread. When no slot frees up
+within `PASSWORD_HASHING_QUEUE_TIMEOUT` seconds the request fails with a 503.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_slots = None
+_executor = None
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Server is busy, please try again later.')
+    default_code = 'hashing_unavailable'
+
+
+class HashingStats:
+    """
+    Timings of the hashing calls made by this process. `wait` is the time
+    spent waiting for a slot and `run` is the time spent hashing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.rejected = 0
+            self.wait = 0.0
+            self.run = 0.0
+            self.max_wait = 0.0
+            self.max_run = 0.0
+
+    def record(self, wait, run):
+        with self._lock:
+            self.calls += 1
+            self.wait += wait
+            self.run += run
+            self.max_wait = max(self.max_wait, wait)
+            self.max_run = max(self.max_run, run)
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+
+stats = HashingStats()
+
+
+def get_slots():
+    global _slots
+
+    with _lock:
+        if _slots is None:
+            concurrency = settings.PASSWORD_HASHING_CONCURRENCY
+            _slots = threading.BoundedSemaphore(concurrency)
+
+        return _slots
+
+
+def get_executor():
+    global _executor
+
+    if not settings.PASSWORD_HASHING_PROCESSES:
+        return None
+
+    with _lock:
+        if _executor is None:
+            # Worker threads may already be running, so don't fork.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_CONCURRENCY,
+                mp_context=multiprocessing.get_context('forkserver'),
+            )
+
+        return _executor
+
+
+def run(func, *args):
+    slots = get_slots()
+    queued = time.monotonic()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+        stats.reject()
+        logger.warning('%s: no hashing slot available', func.__name__)
+        raise HashingUnavailable()
+
+    started = time.monotonic()
+    try:
+        executor = get_executor()
+        if executor is None:
+            result = func(*args)
+        else:
+            result = executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+    finished = time.monotonic()
+    wait, elapsed = started - queued, finished - started
+    stats.record(wait, elapsed)
+    logger.debug(
+        '%s: waited %.1fms, ran %.1fms',
+        func.__name__,
+        wait * 1000,
+        elapsed * 1000,
+    )
+    return result
+
+
+def _map(func, items):
+    return [func(item) for item in items]
+
+
+def run_batch(func, items):
+    """
+    Apply `func` to every item. Waits for one slot like `run`, then takes
+    whatever other slots are free and splits the items between them.
+    """
+    if not items:
+        return []
+
+    slots = get_slots()
+    queued = time.monotonic()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+        stats.reject()
+        logger.warning('%s: no hashing slot available', func.__name__)
+        raise HashingUnavailable()
+
+    taken = 1
+    limit = min(settings.PASSWORD_HASHING_CONCURRENCY, len(items))
+    while taken < limit and slots.acquire(blocking=False):
+        taken += 1
+
+    started = time.monotonic()
+    try:
+        executor = get_executor()
+        if executor is None:
+            results = _map(func, items)
+        else:
+            size = -(-len(items) // taken)
+            futures = [
+                executor.submit(_map, func, items[i:i + size])
+                for i in range(0, len(items), size)
+            ]
+            results = [r for future in futures for r in future.result()]
+    finally:
+        for slot in range(taken):
+            slots.release()
+
+    finished = time.monotonic()
+    wait, elapsed = started - queued, finished - started
+    stats.record(wait, elapsed)
+    logger.debug(
+        '%s: %d items on %d slots, waited %.1fms, ran %.1fms',
+        func.__name__,
+        len(items),
+        taken,
+        wait * 1000,
+        elapsed * 1000,
+    )
+    return results
+
+
+def make_password(password):
+    return run(hashers.make_password, password)
+
+
+def make_passwords(passwords):
+    return run_batch(hashers.make_password, list(passwords))
+
+
+def check_password(password, encoded, setter=None):
+    """
+    Same as `django.contrib.auth.hashers.check_password`. The setter is
+    called in this process since it usually saves the user.
+    """
+    is_correct = run(hashers.check_password, password, encoded)
+    if setter and is_correct and must_update(encoded):
+        setter(password)
+
+    return is_correct
+
+
+def must_update(encoded):
+    preferred = hashers.get_hasher('default')
+    hasher = hashers.identify_hasher(encoded)
+    return (
+        hasher.algorithm != preferred.algorithm or
+        preferred.must_update(encoded)
+    )
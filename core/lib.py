@@ -1,8 +1,83 @@
+import functools
+import itertools
 import random
+import re
+
+from faker import Faker
 
 from core.models import COUNTRIES
 
 
 def get_random_country():
     country = random.choice(COUNTRIES)
-    return country[0]
+    return country.code
+
+
+@functools.lru_cache(maxsize=None)
+def get_country_codes():
+    return tuple(country.code for country in COUNTRIES)
+
+
+def get_random_countries(count, weights=None, rng=random):
+    """
+    Return `count` random country codes drawn in a single call.
+
+    `weights` optionally maps country codes to relative weights. Countries
+    that are not in it are never drawn. Raises ValueError if a weight is
+    negative or no country has a positive weight.
+    """
+    codes = get_country_codes()
+    if weights is None:
+        return rng.choices(codes, k=count)
+
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError('Country weights can not be negative.')
+
+    codes = [code for code in codes if weights.get(code)]
+    if not codes:
+        raise ValueError('No country code has a positive weight.')
+
+    cum_weights = list(itertools.accumulate(weights[code] for code in codes))
+    return rng.choices(codes, cum_weights=cum_weights, k=count)
+
+
+def get_fake_profiles(count, seed=None, pool_size=1000):
+    """
+    Return `count` fake user profiles for seeding test and staging data. Each
+    profile holds `User` fields, so `User(**profile)` builds the user.
+
+    Names are drawn from a pool of `pool_size` Faker names instead of calling
+    Faker for every row, which is what makes large batches fast.
+    """
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+
+    def slug(name):
+        return re.sub(r'[^a-z]', '', name.lower())
+
+    pool_size = max(1, min(count, pool_size))
+    first_names = [fake.first_name() for _ in range(pool_size)]
+    first_names = [(name, slug(name)) for name in first_names]
+    last_names = [fake.last_name() for _ in range(pool_size)]
+    last_names = [(name, slug(name)) for name in last_names]
+
+    # Makes emails unique across batches generated with different seeds.
+    batch = f'{rng.getrandbits(32):08x}'
+    profiles = []
+    rows = zip(
+        rng.choices(first_names, k=count),
+        rng.choices(last_names, k=count),
+    )
+    for i, (first, last) in enumerate(rows):
+        first_name, first_slug = first
+        last_name, last_slug = last
+        email = f'{first_slug}.{last_slug}.{batch}{i}@example.com'
+        profiles.append(dict(
+            email=email,
+            username=email,
+            first_name=first_name,
+            last_name=last_name,
+        ))
+
+    return profiles
@@ -0,0 +1,91 @@
+"""
+Batched email delivery.
+
+Opening an SMTP connection costs a TCP and often a TLS handshake, which is
+more than sending a message over it. `send_messages` sends a batch of
+messages over a single connection and reports the ones that failed, so the
+task sending them can retry those.
+"""
+import collections
+import functools
+import logging
+import smtplib
+
+from django.core.mail import get_connection
+from django.template import loader
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_template(name):
+    """
+    Return the compiled template. Templates are loaded and parsed once per
+    process, unlike `render_to_string` which looks them up on every call.
+    """
+    return loader.get_template(name)
+
+
+def render(name, context):
+    return get_template(name).render(context)
+
+
+class MailError(Exception):
+    """
+    Raised by `send_messages` with the messages that couldn't be sent.
+    """
+
+    def __init__(self, failed):
+        super().__init__(f'{len(failed)} emails could not be sent')
+        self.failed = failed
+
+
+def send_messages(messages):
+    """
+    Send `messages` over one connection. A message that fails is logged and
+    the rest are still sent, then MailError is raised with the failed ones so
+    the caller can retry them.
+    """
+    failed = []
+    remaining = collections.deque(messages)
+    connection = get_connection()
+    try:
+        connection.open()
+        while remaining:
+            message = remaining.popleft()
+            message.connection = connection
+            try:
+                connection.send_messages([message])
+            except Exception:
+                failed.append(message)
+                logger.exception('Failed to send email to %s', message.to)
+                reconnect(connection)
+    except Exception:
+        # The connection couldn't be opened or reopened, the rest of the
+        # batch can't be sent.
+        failed += remaining
+        logger.exception('Failed to open the email connection')
+    finally:
+        connection.close()
+
+    logger.info(
+        'Sent a batch of %d emails, %d failed',
+        len(messages) - len(failed),
+        len(failed),
+    )
+    if failed:
+        raise MailError(failed)
+
+
+def reconnect(connection):
+    # A refused recipient leaves the session usable, a dropped connection
+    # has to be opened again for the next message.
+    smtp = getattr(connection, 'connection', None)
+    if smtp is None:
+        return
+
+    try:
+        smtp.noop()
+    except smtplib.SMTPServerDisconnected:
+        connection.connection = None
+        connection.open()
@@ -0,0 +1,28 @@
+from django.core.management import BaseCommand
+
+from core.cache import STATS
+
+
+class Command(BaseCommand):
+    help = 'Print hit/miss counters for the application caches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them.',
+        )
+
+    def handle(self, *args, **kwargs):
+        # Import the modules that register their counters.
+        import core.authentication  # noqa
+        import core.responses  # noqa
+
+        for name, stats in sorted(STATS.items()):
+            values = stats.get()
+            self.stdout.write(
+                f'{name}: hits={values["hits"]} misses={values["misses"]} '
+                f'ratio={values["ratio"]:.2%}'
+            )
+            if kwargs['reset']:
+                stats.reset()
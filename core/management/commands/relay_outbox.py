@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = 'Publish the Celery tasks queued in the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit.',
+        )
+
+    def handle(self, *args, **kwargs):
+        while True:
+            published = outbox.drain()
+            if published:
+                self.stdout.write(f'Published {published} tasks')
+
+            if kwargs['once']:
+                return
+
+            if not published:
+                time.sleep(settings.OUTBOX_DRAIN_INTERVAL)
@@ -0,0 +1,60 @@
+import glob
+import os
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from core import metrics
+
+
+def seconds(value):
+    if value is None:
+        return '-'
+
+    if value == float('inf'):
+        return f'>{metrics.SECONDS[-1]}s'
+
+    return f'{value * 1000:.0f}ms'
+
+
+class Command(BaseCommand):
+    help = 'Print queue wait, runtime and failures of the Celery tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete the metrics files after printing them.',
+        )
+
+    def handle(self, *args, **kwargs):
+        directory = settings.TASK_METRICS_DIR
+        if not directory:
+            raise CommandError('TASK_METRICS_DIR is not set.')
+
+        for name, stats in sorted(metrics.read_all(directory).items()):
+            self.stdout.write(
+                f'{name}: count={stats.runtime.count} '
+                f'succeeded={stats.succeeded} failed={stats.failed} '
+                f'retried={stats.retried}'
+            )
+            for label, histogram in (
+                ('wait', stats.wait),
+                ('runtime', stats.runtime),
+            ):
+                self.stdout.write(
+                    f'  {label}: p50={seconds(histogram.quantile(0.5))} '
+                    f'p95={seconds(histogram.quantile(0.95))} '
+                    f'p99={seconds(histogram.quantile(0.99))} '
+                    f'mean={seconds(histogram.mean())}'
+                )
+
+            payload = stats.payload.mean()
+            self.stdout.write(
+                f'  payload: published={stats.payload.count} '
+                f'mean={payload or 0:.0f}B'
+            )
+
+        if kwargs['reset']:
+            for path in glob.glob(os.path.join(directory, '*.json')):
+                os.remove(path)
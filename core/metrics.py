@@ -0,0 +1,231 @@
+"""
+Celery task metrics.
+
+Signal handlers record, per task name, how long tasks waited in the queue
+(publish to start), how long they ran, the size of their published
+arguments and how many succeeded, failed or were retried. Runs of batch
+tasks are recorded as `<task name> (batch)`, with their runtime and whether
+any of their items failed. Each process keeps its own counts and, when
+`TASK_METRICS_DIR` is set, writes them to `TASK_METRICS_DIR/<pid>.json` at
+most every `TASK_METRICS_WRITE_INTERVAL` seconds. `./manage.py task_metrics`
+adds up the files of all processes.
+"""
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from celery import signals
+from django.conf import settings
+
+# Upper bounds of the histogram buckets, the last bucket has no bound.
+SECONDS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1, 2.5, 5, 10, 30, 60, 300,
+)
+BYTES = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+PUBLISHED_AT = 'published_at'
+
+
+class Histogram:
+    def __init__(self, bounds, counts=None, total=0.0):
+        self.bounds = bounds
+        self.counts = counts or [0] * (len(bounds) + 1)
+        self.total = total
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+
+    def quantile(self, q):
+        """
+        Return the upper bound of the bucket holding the `q` quantile, inf
+        if it is the last bucket and None if nothing was observed.
+        """
+        count = self.count
+        if not count:
+            return None
+
+        seen = 0
+        for bound, bucket in zip((*self.bounds, float('inf')), self.counts):
+            seen += bucket
+            if seen >= q * count:
+                return bound
+
+    def mean(self):
+        count = self.count
+        return self.total / count if count else None
+
+    def as_dict(self):
+        return {'counts': self.counts, 'total': self.total}
+
+
+class TaskStats:
+    COUNTERS = ('succeeded', 'failed', 'retried')
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.wait = self._histogram(SECONDS, data.get('wait'))
+        self.runtime = self._histogram(SECONDS, data.get('runtime'))
+        self.payload = self._histogram(BYTES, data.get('payload'))
+        for name in self.COUNTERS:
+            setattr(self, name, data.get(name, 0))
+
+    def _histogram(self, bounds, data):
+        return Histogram(bounds, **(data or {}))
+
+    def merge(self, other):
+        self.wait.merge(other.wait)
+        self.runtime.merge(other.runtime)
+        self.payload.merge(other.payload)
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dict(self):
+        data = {
+            'wait': self.wait.as_dict(),
+            'runtime': self.runtime.as_dict(),
+            'payload': self.payload.as_dict(),
+        }
+        for name in self.COUNTERS:
+            data[name] = getattr(self, name)
+
+        return data
+
+
+class TaskMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self._written = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.tasks = defaultdict(TaskStats)
+
+    def published(self, name, size):
+        with self._lock:
+            self.tasks[name].payload.observe(size)
+
+    def started(self, task_id, name, published_at):
+        with self._lock:
+            self._started[task_id] = time.monotonic()
+            if published_at is not None:
+                wait = max(time.time() - published_at, 0)
+                self.tasks[name].wait.observe(wait)
+
+    def finished(self, task_id, name, state):
+        with self._lock:
+            started = self._started.pop(task_id, None)
+            stats = self.tasks[name]
+            if started is not None:
+                stats.runtime.observe(time.monotonic() - started)
+
+            if state == 'SUCCESS':
+                stats.succeeded += 1
+            elif state == 'FAILURE':
+                stats.failed += 1
+            elif state == 'RETRY':
+                stats.retried += 1
+
+    def batch(self, name, runtime, failed):
+        with self._lock:
+            stats = self.tasks[f'{name} (batch)']
+            stats.runtime.observe(runtime)
+            if failed:
+                stats.failed += 1
+            else:
+                stats.succeeded += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: stats.as_dict() for name, stats in self.tasks.items()
+            }
+
+    def path(self):
+        return os.path.join(settings.TASK_METRICS_DIR, f'{os.getpid()}.json')
+
+    def write(self):
+        directory = settings.TASK_METRICS_DIR
+        if not directory:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        path = self.path()
+        temp = f'{path}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(self.as_dict(), f)
+
+        # Readers never see a half written file.
+        os.replace(temp, path)
+        self._written = time.monotonic()
+
+    def maybe_write(self):
+        interval = settings.TASK_METRICS_WRITE_INTERVAL
+        if time.monotonic() - self._written >= interval:
+            self.write()
+
+
+metrics = TaskMetrics()
+
+
+def read_all(directory):
+    """
+    Return the merged `TaskStats` of every process that wrote metrics.
+    """
+    tasks = defaultdict(TaskStats)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        with open(path) as f:
+            data = json.load(f)
+
+        for name, stats in data.items():
+            tasks[name].merge(TaskStats(stats))
+
+    return dict(tasks)
+
+
+def payload_size(body):
+    return len(json.dumps(body, default=repr))
+
+
+def task_published(sender=None, body=None, headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_AT] = time.time()
+
+    metrics.published(sender, payload_size(body))
+    # Relays only publish, they never finish a task.
+    metrics.maybe_write()
+
+
+def task_started(task_id=None, task=None, **kwargs):
+    metrics.started(task_id, task.name, task.request.get(PUBLISHED_AT))
+
+
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    metrics.finished(task_id, task.name, state)
+    metrics.maybe_write()
+
+
+def process_stopped(**kwargs):
+    metrics.write()
+
+
+def connect():
+    signals.before_task_publish.connect(task_published, weak=False)
+    signals.task_prerun.connect(task_started, weak=False)
+    signals.task_postrun.connect(task_finished, weak=False)
+    signals.worker_process_shutdown.connect(process_stopped, weak=False)
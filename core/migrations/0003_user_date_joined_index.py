@@ -0,0 +1,21 @@
+# Generated by Django 3.2.3 on 2026-10-18 02:59
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # The index is built without locking out writes to the user table,
+    # which can't happen inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0002_add_sample_users'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='core_user_joined_id_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:09
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+)
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking out writes to the user table,
+    # which can't happen inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_user_date_joined_index'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['email'], name='core_user_email_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='core_user_first_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='core_user_last_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_search_trgm_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailverification',
+            name='code',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
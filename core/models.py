@@ -1,16 +1,17 @@
 import hashlib
 
-import pycountry
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.core.mail import EmailMultiAlternatives
-from django.db import models
+from django.db import models, transaction
 from django.shortcuts import reverse
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
 
-COUNTRIES = [(c.alpha_2, c.name) for c in pycountry.countries]
+from core import countries, hashing, mail
+from core.responses import user_detail_cache
+
+COUNTRIES = countries.registry
 
 SIGNUP_USER = 'signup@example.com'
 
@@ -22,20 +23,102 @@ DEFAULT_USERS = [
 
 
 class User(AbstractUser):
+    # Changing any of these revokes the user's signed access tokens.
+    AUTH_FIELDS = [
+        'email',
+        'password',
+        'is_active',
+        'is_staff',
+        'is_superuser',
+    ]
+
     email = models.EmailField(_('email address'), unique=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Serves the keyset pagination of /users/.
+            models.Index(
+                fields=['-date_joined', '-id'],
+                name='core_user_joined_id_idx',
+            ),
+            # Serve the ILIKE filters of ?search= on /users/.
+            GinIndex(
+                fields=['email'],
+                name='core_user_email_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+            GinIndex(
+                fields=['first_name'],
+                name='core_user_first_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+            GinIndex(
+                fields=['last_name'],
+                name='core_user_last_name_trgm_idx',
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
+
     def __str__(self):
         return self.username
 
-    def send_verification_email(self):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user.reset_auth_state()
+        return user
+
+    def get_auth_state(self):
+        # Read from __dict__ so deferred fields are not loaded.
+        return {
+            name: self.__dict__[name]
+            for name in self.AUTH_FIELDS
+            if name in self.__dict__
+        }
+
+    def reset_auth_state(self):
+        self._loaded_auth_state = self.get_auth_state()
+
+    def auth_state_changed(self):
+        loaded = getattr(self, '_loaded_auth_state', {})
+        current = self.get_auth_state()
+        return any(
+            current.get(name) != value for name, value in loaded.items()
+        )
+
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+    def get_email_verification(self):
+        try:
+            # Free when loaded with select_related('email_verification').
+            return self.email_verification
+        except EmailVerification.DoesNotExist:
+            pass
+
         email_verification, _ = EmailVerification.objects.get_or_create(
             user=self,
             defaults={'code': EmailVerification.generate_code(self.email)},
         )
-        email_verification.send_verification_link()
+        return email_verification
+
+    def build_verification_email(self):
+        return self.get_email_verification().build_verification_message()
+
+    def send_verification_email(self):
+        self.get_email_verification().send_verification_link()
 
     def verify_email(self, key):
-        self.email_verification.verify(key)
+        return EmailVerification.verify_code(self.id, key)
 
 
 class EmailVerification(models.Model):
@@ -45,7 +128,7 @@ class EmailVerification(models.Model):
         related_name='email_verification',
     )
     is_verified = models.BooleanField(default=False)
-    code = models.CharField(max_length=100)
+    code = models.CharField(max_length=100, db_index=True)
 
     def __str__(self):
         return self.user.email
@@ -54,7 +137,7 @@ class EmailVerification(models.Model):
     def generate_code(cls, key):
         return hashlib.md5(key.encode()).hexdigest()
 
-    def send_verification_link(self):
+    def build_verification_message(self):
         code = self.code
         path = reverse(
             'user-complete-email-verification',
@@ -67,15 +150,48 @@ class EmailVerification(models.Model):
         }
 
         subject = 'Welcome to Fantasy Soccer League'
-        html_message = render_to_string('email/welcome.html', context)
-        plain_message = strip_tags(html_message)
+        html_message = mail.render('email/welcome.html', context)
+        plain_message = mail.render('email/welcome.txt', context)
         from_email = settings.DEFAULT_FROM_EMAIL
         to = self.user.email
 
         msg = EmailMultiAlternatives(subject, plain_message, from_email, [to])
         msg.attach_alternative(html_message, "text/html")
-        msg.send()
+        return msg
+
+    def send_verification_link(self):
+        self.build_verification_message().send()
+
+    @classmethod
+    def verify_code(cls, user_id, code):
+        """
+        Mark the user's email as verified if `code` is theirs, with a single
+        conditional UPDATE. Returns whether the code is valid, so repeated
+        requests for a verified email succeed without writing.
+        """
+        verifications = cls.objects.filter(user_id=user_id, code=code)
+        if verifications.filter(is_verified=False).update(is_verified=True):
+            transaction.on_commit(lambda: user_detail_cache.bump([user_id]))
+            return True
+
+        return verifications.exists()
 
     def verify(self, key):
-        self.is_verified = key == self.code
-        self.save()
+        if self.verify_code(self.user_id, key):
+            self.is_verified = True
+
+        return self.is_verified
+
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task to publish once the transaction that queued it commits.
+    See `core.outbox`.
+    """
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.task
@@ -0,0 +1,88 @@
+"""
+A transactional outbox for Celery tasks.
+
+`enqueue` stores the task in the database, in the transaction of the request
+that wants it sent. The row is only visible once that transaction commits
+and is gone if it rolls back, so requests never wait for the broker and no
+task is lost when the broker is slow or down. `drain` publishes the stored
+tasks in batches over one broker connection; it runs as a beat task and can
+run as a separate relay with `./manage.py relay_outbox`.
+
+Delivery is at least once: a task can be published again if the relay dies
+between publishing it and deleting its row.
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from app import celery
+from core.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, *args, **kwargs):
+    return OutboxMessage.objects.create(
+        task=task.name,
+        args=args,
+        kwargs=kwargs,
+    )
+
+
+def publish(messages):
+    """
+    Publish `messages` over one producer and return the ones that were
+    published. Stops at the first failure, the rest stay queued.
+    """
+    published = []
+    try:
+        with celery.app.producer_or_acquire() as producer:
+            for message in messages:
+                celery.app.send_task(
+                    message.task,
+                    args=message.args,
+                    kwargs=message.kwargs,
+                    producer=producer,
+                )
+                published.append(message)
+    except Exception:
+        logger.exception(
+            'Published %d of %d outbox messages',
+            len(published),
+            len(messages),
+        )
+
+    return published
+
+
+def drain_batch(batch_size):
+    with transaction.atomic():
+        queryset = OutboxMessage.objects.order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent relays take different batches.
+            queryset = queryset.select_for_update(skip_locked=True)
+
+        messages = list(queryset[:batch_size])
+        if not messages:
+            return 0, 0
+
+        published = publish(messages)
+        ids = [message.id for message in published]
+        OutboxMessage.objects.filter(id__in=ids).delete()
+
+    return len(messages), len(published)
+
+
+def drain(batch_size=None):
+    """
+    Publish queued tasks until the outbox is empty or the broker fails.
+    Returns the number of tasks published.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    total = 0
+    while True:
+        taken, published = drain_batch(batch_size)
+        total += published
+        if taken < batch_size or published < taken:
+            return total
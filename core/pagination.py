@@ -0,0 +1,259 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import (
+    BooleanField,
+    DateTimeField,
+    Field,
+    Func,
+    IntegerField,
+    QuerySet,
+    Value,
+)
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor
+from rest_framework.response import Response
+
+
+class EstimatedPage(Page):
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that reads the row count of an unfiltered queryset from the
+    Postgres planner statistics instead of running `COUNT(*)`. Tables smaller
+    than `PAGINATION_EXACT_COUNT_THRESHOLD` rows are still counted exactly.
+
+    The estimate misses rows added since the table was last analyzed, so
+    with an estimated count, pages aren't bounded by it. A page exists if it
+    has rows and has a next page if one more row follows it.
+    """
+    count_is_exact = True
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+        if estimate is None or estimate < threshold:
+            self.count_is_exact = True
+            return super().count
+
+        self.count_is_exact = False
+        return estimate
+
+    def validate_number(self, number):
+        self.count  # Sets count_is_exact.
+        if self.count_is_exact:
+            return super().validate_number(number)
+
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+
+        return EstimatedPage(
+            rows[:self.per_page],
+            number,
+            self,
+            has_more=len(rows) > self.per_page,
+        )
+
+    def estimate(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+
+        query = queryset.query
+        filtered = query.where or query.distinct or query.combinator
+        if filtered or query.is_sliced:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        # reltuples is -1 (or 0 on older versions) until the table has been
+        # vacuumed or analyzed.
+        if row is None or row[0] <= 0:
+            return None
+
+        return int(row[0])
+
+
+class EstimatedCountPagination(pagination.PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_exact', paginator.count_is_exact),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_exact'] = {
+            'type': 'boolean',
+            'example': True,
+        }
+        return response_schema
+
+
+class RowValue(Func):
+    """
+    `(a, b)`, for comparing several columns at once.
+    """
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """
+    Cursor pagination keyed on `(date_joined, id)`, newest first.
+
+    DRF's `CursorPagination` filters on the first ordering field only and
+    skips ties with an offset. This compares the whole key with a row value
+    comparison, which the matching composite index serves directly, so every
+    page costs the same no matter how deep it is. There is no count.
+    """
+    ordering = ('-date_joined', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse = self.cursor.reverse
+            position = self.parse_position(self.cursor.position)
+
+        if reverse:
+            queryset = queryset.order_by('date_joined', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            queryset = self.filter_position(
+                queryset,
+                position,
+                '>' if reverse else '<',
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.current_position = self.cursor and self.cursor.position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def filter_position(self, queryset, position, operator):
+        date_joined, pk = position
+        condition = Func(
+            RowValue('date_joined', 'id'),
+            RowValue(
+                Value(date_joined, output_field=DateTimeField()),
+                Value(pk, output_field=IntegerField()),
+            ),
+            arg_joiner=f' {operator} ',
+            template='%(expressions)s',
+            output_field=BooleanField(),
+        )
+        return queryset.filter(condition)
+
+    def format_position(self, row):
+        return f'{row.date_joined.isoformat()}|{row.id}'
+
+    def parse_position(self, position):
+        if position is None:
+            return None
+
+        try:
+            date_joined, pk = position.split('|')
+            date_joined = parse_datetime(date_joined)
+            pk = int(pk)
+        except ValueError:
+            date_joined = None
+
+        if date_joined is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return date_joined, pk
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        if self.page:
+            position = self.format_position(self.page[-1])
+        else:
+            position = self.current_position
+
+        cursor = Cursor(offset=0, reverse=False, position=position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        if self.page:
+            position = self.format_position(self.page[0])
+        else:
+            position = self.current_position
+
+        cursor = Cursor(offset=0, reverse=True, position=position)
+        return self.encode_cursor(cursor)
@@ -0,0 +1,39 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON into a list with a row per line.
+
+    A line that isn't valid JSON is kept as its raw text, so it fails the
+    validation of that row instead of failing the whole request.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        rows = []
+        if stream is None:
+            return rows
+
+        for number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                line = line.decode(encoding)
+            except UnicodeDecodeError:
+                raise ParseError(f'Line {number} is not {encoding} text.')
+
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                rows.append(line)
+
+        return rows
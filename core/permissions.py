@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from rest_framework.authtoken.models import Token
 
 from core.models import SIGNUP_USER
 
@@ -49,3 +50,13 @@ class IsNotDefaultUser(permissions.BasePermission):
                 request.user.email == SIGNUP_USER):
             return False
         return True
+
+
+class IsTokenAuthenticated(permissions.BasePermission):
+    """
+    Only allow requests authenticated with a DB token. Signed access tokens
+    can't be used to get new access tokens.
+    """
+
+    def has_permission(self, request, view):
+        return isinstance(request.auth, Token)
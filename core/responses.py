@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from core.cache import CacheStats
+
+
+class PrecomputedJSON:
+    """
+    A JSON body rendered once and served as-is, with a gzip variant and
+    strong ETags. Each encoding gets its own ETag since the bytes differ.
+    """
+
+    def __init__(self, data):
+        self.body = JSONRenderer().render(data)
+        self.gzip_body = gzip.compress(self.body, mtime=0)
+        digest = hashlib.sha1(self.body).hexdigest()
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def accepts_gzip(self, request):
+        """
+        Whether Accept-Encoding allows gzip: listed, or covered by `*`, with
+        a q-value above 0.
+        """
+        qualities = {}
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for coding in accept_encoding.split(','):
+            name, *params = [part.strip() for part in coding.split(';')]
+            quality = 1.0
+            for param in params:
+                key, _, value = param.partition('=')
+                if key.strip().lower() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+
+            qualities[name.lower()] = quality
+
+        return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+    def as_response(self, request):
+        if self.accepts_gzip(request):
+            body, etag = self.gzip_body, self.gzip_etag
+        else:
+            body, etag = self.body, self.etag
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if '*' in etags or {self.etag, self.gzip_etag} & set(etags):
+                response = HttpResponseNotModified()
+                response['ETag'] = etag
+                response['Vary'] = 'Accept-Encoding'
+                return response
+
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Vary'] = 'Accept-Encoding'
+        if body is self.gzip_body:
+            response['Content-Encoding'] = 'gzip'
+
+        return response
+
+
+class VersionedResponseCache:
+    """
+    Rendered response bodies cached per object and variant.
+
+    Every object has a version in the cache and bodies are stored under it.
+    Bumping the version makes all of the object's bodies unreachable; they
+    are never deleted and expire on their own. Versions are random rather
+    than counters, so an evicted version can't come back and expose bodies
+    stored under it.
+    """
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.stats = CacheStats(name)
+
+    def version_key(self, pk):
+        return f'{self.name}:version:{pk}'
+
+    def body_key(self, pk, version, variant):
+        digest = hashlib.md5(repr(variant).encode()).hexdigest()
+        return f'{self.name}:body:{pk}:{version}:{digest}'
+
+    def new_version(self):
+        return secrets.token_hex(8)
+
+    def get_version(self, pk):
+        key = self.version_key(pk)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, self.new_version(), timeout=None)
+            version = cache.get(key)
+
+        return version
+
+    def get(self, pk, variant, record_miss=True):
+        """
+        Return `(body, version)`. The body is None on a miss, and should be
+        stored with the returned version, which was read before it was built.
+        Callers that hand a miss on to a view which looks again pass
+        `record_miss=False`, so it is only counted once.
+        """
+        version = self.get_version(pk)
+        body = cache.get(self.body_key(pk, version, variant))
+        if body is None:
+            if record_miss:
+                self.stats.miss()
+        else:
+            self.stats.hit()
+
+        return body, version
+
+    def set(self, pk, version, variant, body):
+        cache.set(self.body_key(pk, version, variant), body, self.timeout)
+
+    def bump(self, pks):
+        cache.set_many(
+            {self.version_key(pk): self.new_version() for pk in pks},
+            timeout=None,
+        )
+
+
+user_detail_cache = VersionedResponseCache(
+    'user-detail',
+    settings.USER_DETAIL_CACHE_TIMEOUT,
+)
+
+
+def user_detail_variant(serializer_class, media_type, request):
+    """
+    What a cached user detail body depends on besides the user: the fields
+    it has, its format and the host its URLs point to.
+    """
+    params = request.GET
+    return (
+        serializer_class.__name__,
+        media_type,
+        request.scheme,
+        request.get_host(),
+        params.get('fields'),
+        params.get('exclude'),
+    )
@@ -1,12 +1,57 @@
-from django.contrib.auth.hashers import make_password
+from django.conf import settings
 from django.db import transaction
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 
+from core import hashing, outbox
 from core.models import User
 from core.tasks import send_verification_email
 
 
-class UserAdminSerializer(serializers.ModelSerializer):
+def parse_field_list(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Lets read requests select fields with `?fields=a,b` or drop them with
+    `?exclude=a,b`. Unknown names are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return
+
+        params = request.query_params
+        if 'fields' in params:
+            keep = parse_field_list(params['fields'])
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+        if 'exclude' in params:
+            for name in parse_field_list(params['exclude']):
+                self.fields.pop(name, None)
+
+    def get_source_columns(self):
+        """
+        Return the model columns the remaining fields read from.
+        """
+        model_fields = {f.name for f in self.Meta.model._meta.concrete_fields}
+        columns = set()
+        for field in self.fields.values():
+            if field.write_only or field.source == '*':
+                continue
+
+            name = field.source.split('.')[0]
+            if name in model_fields:
+                columns.add(name)
+
+        return columns
+
+
+class UserAdminSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(max_length=128, write_only=True)
 
     class Meta:
@@ -23,7 +68,8 @@ class UserAdminSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['username'] = validated_data['email']
-        validated_data['password'] = make_password(validated_data['password'])
+        password = hashing.make_password(validated_data['password'])
+        validated_data['password'] = password
         return super().create(validated_data)
 
     def update(self, user, validated_data):
@@ -31,7 +77,7 @@ class UserAdminSerializer(serializers.ModelSerializer):
             validated_data['username'] = validated_data['email']
 
         if 'password' in validated_data:
-            password = make_password(validated_data['password'])
+            password = hashing.make_password(validated_data['password'])
             validated_data['password'] = password
 
         return super().update(user, validated_data)
@@ -52,16 +98,95 @@ class SignupSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data['username'] = validated_data['email']
-        validated_data['password'] = make_password(validated_data['password'])
+        password = hashing.make_password(validated_data['password'])
+        validated_data['password'] = password
         with transaction.atomic():
             user = super().create(validated_data)
-
-        transaction.on_commit(lambda: send_verification_email.delay(user.id))
+            outbox.enqueue(send_verification_email, user.id)
 
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class BulkSignupSerializer(serializers.ModelSerializer):
+    """
+    Validates one row of a bulk signup. Email uniqueness is checked for the
+    whole chunk at once by `core.bulk`, not with a query per row.
+    """
+    password = serializers.CharField(max_length=128, write_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            'password',
+            'first_name',
+            'last_name',
+            'email',
+        ]
+        extra_kwargs = {'email': {'validators': []}}
+
+
+class UserTargetSerializer(serializers.Serializer):
+    """
+    Selects the users of a bulk change by ids, filters or both. Something has
+    to be given, so a change can't apply to everyone by accident.
+    """
+    TARGET_FIELDS = [
+        'ids',
+        'is_staff',
+        'is_active',
+        'joined_after',
+        'joined_before',
+    ]
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.BULK_UPDATE_MAX_IDS,
+    )
+    is_staff = serializers.BooleanField(required=False)
+    is_active = serializers.BooleanField(required=False)
+    joined_after = serializers.DateTimeField(required=False)
+    joined_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        if not any(name in attrs for name in self.TARGET_FIELDS):
+            raise serializers.ValidationError('Select users by ids or filter.')
+
+        return attrs
+
+
+class BulkUpdateSerializer(UserTargetSerializer):
+    """
+    One change set of a bulk update. `data` is validated as a partial update
+    by the `serializer_class` given in the context.
+    """
+    data = serializers.DictField()
+
+    def validate_data(self, value):
+        serializer_class = self.context['serializer_class']
+        serializer = serializer_class(
+            data=value,
+            partial=True,
+            context=self.context,
+        )
+        if not serializer.is_valid():
+            raise serializers.ValidationError(serializer.errors)
+
+        values = dict(serializer.validated_data)
+        if 'email' in values:
+            # Emails are unique, setting one on many users can't work.
+            raise serializers.ValidationError({
+                'email': ['Email can not be changed in bulk.'],
+            })
+
+        if not values:
+            raise serializers.ValidationError('No fields to update.')
+
+        return values
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(max_length=128, write_only=True)
 
     class Meta:
@@ -77,7 +202,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def update(self, user, validated_data):
         if 'password' in validated_data:
-            password = make_password(validated_data['password'])
+            password = hashing.make_password(validated_data['password'])
             validated_data['password'] = password
 
         return super().update(user, validated_data)
@@ -85,3 +210,31 @@ class UserSerializer(serializers.ModelSerializer):
 
 class EmptySerializer(serializers.Serializer):
     pass
+
+
+class UserExportSerializer(serializers.Serializer):
+    FIELDS = [
+        'id',
+        'email',
+        'username',
+        'first_name',
+        'last_name',
+        'is_staff',
+        'is_active',
+        'date_joined',
+        'last_login',
+    ]
+
+    type = serializers.ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+    fields = serializers.CharField(required=False)
+    joined_after = serializers.DateTimeField(required=False)
+    joined_before = serializers.DateTimeField(required=False)
+
+    def validate_fields(self, value):
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(fields) - set(self.FIELDS)
+        if unknown:
+            unknown = ', '.join(sorted(unknown))
+            raise serializers.ValidationError(f'Unknown fields: {unknown}')
+
+        return fields
@@ -0,0 +1,67 @@
+import functools
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import (
+    forget_credentials,
+    forget_token,
+    forget_user_tokens,
+)
+from core.models import EmailVerification, User
+from core.responses import user_detail_cache
+from core.tokens import revoke_access_tokens
+
+
+def forget_user_details(user_ids):
+    # Readers store responses under the version they read before loading the
+    # user, so the bump has to wait until the new data is visible to them.
+    bump = functools.partial(user_detail_cache.bump, user_ids)
+    transaction.on_commit(bump)
+
+
+# Sent by bulk updates, which bypass post_save. Receives `user_ids` and the
+# names of the changed `fields`.
+users_updated = Signal()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    forget_token(instance.key)
+    revoke_access_tokens([instance.user_id])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    forget_user_tokens([instance.id])
+    forget_user_details([instance.id])
+    if instance.auth_state_changed():
+        revoke_access_tokens([instance.id])
+        forget_credentials([instance.id])
+
+    instance.reset_auth_state()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    forget_user_details([instance.id])
+
+
+@receiver(post_save, sender=EmailVerification)
+def email_verification_saved(sender, instance, **kwargs):
+    forget_user_details([instance.user_id])
+
+
+@receiver(users_updated, sender=User)
+def users_bulk_updated(sender, user_ids, fields, **kwargs):
+    forget_user_tokens(user_ids)
+    # Already sent after the commit.
+    user_detail_cache.bump(user_ids)
+    if set(fields) & set(User.AUTH_FIELDS):
+        revoke_access_tokens(user_ids)
+        forget_credentials(user_ids)
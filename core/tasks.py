@@ -1,8 +1,49 @@
+from django.conf import settings
+
 from app import celery
+from core import mail, outbox
 from core.models import User
 
 
-@celery.app.task
-def send_verification_email(user_id):
-    user = User.objects.get(id=user_id)
-    user.send_verification_email()
+def send_verification_mail(user_ids):
+    """
+    Send the verification emails of `user_ids` over one connection. Returns
+    the ids whose email couldn't be sent.
+    """
+    users = list(User.objects.filter(id__in=user_ids).select_related(
+        'email_verification',
+    ))
+    messages = [user.build_verification_email() for user in users]
+    try:
+        mail.send_messages(messages)
+    except mail.MailError as exc:
+        return [
+            user.id for user, message in zip(users, messages)
+            if message in exc.failed
+        ]
+
+    return []
+
+
+@celery.app.task(
+    base=celery.BatchTask,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    batch_window=settings.EMAIL_BATCH_WINDOW,
+)
+def send_verification_email(user_ids):
+    failed = send_verification_mail(user_ids)
+    if failed:
+        raise celery.BatchFailed(failed)
+
+
+@celery.app.task(bind=True)
+def send_verification_emails(self, user_ids):
+    failed = send_verification_mail(user_ids)
+    if failed:
+        # Only the emails that weren't sent are sent again.
+        raise self.retry(args=[failed])
+
+
+@celery.app.task(ignore_result=True)
+def drain_outbox():
+    outbox.drain()
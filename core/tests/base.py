@@ -1,13 +1,20 @@
 import json
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.authtoken.models import Token
 
+from app import celery
+from core import outbox
+from core.authentication import verified_credentials
 from core.models import User
 
 
 class BaseTestCase(TestCase):
     def setUp(self):
+        cache.clear()
+        verified_credentials.clear()
         self.admin = 'admin@example.com'
         self.user = 'owner@example.com'
         self.signup_user = 'signup@example.com'
@@ -46,6 +53,17 @@ class BaseTestCase(TestCase):
         token, _ = Token.objects.get_or_create(user=user)
         return token.key
 
+    def drain_outbox(self):
+        """
+        Run the tasks queued in the outbox in this process instead of
+        publishing them.
+        """
+        def send_task(name, args=None, kwargs=None, **options):
+            celery.app.tasks[name](*args, **kwargs)
+
+        with patch.object(celery.app, 'send_task', side_effect=send_task):
+            return outbox.drain()
+
     def assertOK(self, response):
         self.assertEqual(response.status_code//100, 2)
 
@@ -0,0 +1,28 @@
+import sys
+import timeit
+
+from django.test import tag
+
+
+def bench(func, number=100, repeat=5):
+    """
+    Return the best time per call of `func`, in seconds.
+    """
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+@tag('benchmark')
+class BenchmarkMixin:
+    """
+    Benchmarks are excluded from ./scripts/test.sh. Run them with
+    ./scripts/benchmark.sh.
+    """
+
+    def report(self, name, before, after, unit='us'):
+        scale = {'s': 1, 'ms': 1e3, 'us': 1e6}[unit]
+        sys.stderr.write(
+            f'\n{name}: before={before * scale:.1f}{unit} '
+            f'after={after * scale:.1f}{unit} '
+            f'speedup={before / after:.1f}x\n'
+        )
@@ -0,0 +1,91 @@
+import socketserver
+import threading
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        sink = self.server.sink
+        sink.connections += 1
+        self.reply('220 localhost sink')
+        envelope = {'to': []}
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+
+            command = line[:4].upper()
+            if command in ('HELO', 'EHLO'):
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                envelope = {'to': []}
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                address = line.split(':', 1)[1].strip().strip('<>')
+                if address in sink.refused:
+                    self.reply('550 No such user')
+                else:
+                    envelope['to'].append(address)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline().decode().rstrip('\r\n')
+                    if data == '.':
+                        break
+
+                    lines.append(data)
+
+                sink.messages.append((envelope['to'], '\n'.join(lines)))
+                self.reply('250 OK')
+            elif command in ('RSET', 'NOOP'):
+                envelope = {'to': []}
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+
+class SMTPSink:
+    """
+    A minimal SMTP server on localhost that keeps what it receives. Mail to
+    the addresses in `refused` is rejected.
+    """
+
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+        self.connections = 0
+        self.messages = []
+        self.server = socketserver.ThreadingTCPServer(
+            ('127.0.0.1', 0),
+            SMTPHandler,
+        )
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.port = self.server.server_address[1]
+
+    def __enter__(self):
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settings(self):
+        return {
+            'EMAIL_BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+            'EMAIL_HOST': '127.0.0.1',
+            'EMAIL_PORT': self.port,
+            'EMAIL_USE_TLS': False,
+            'EMAIL_USE_SSL': False,
+            'EMAIL_HOST_USER': '',
+            'EMAIL_HOST_PASSWORD': '',
+        }
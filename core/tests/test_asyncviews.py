@@ -0,0 +1,119 @@
+import threading
+from unittest.mock import patch
+
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core import asyncviews
+from core.models import SIGNUP_USER, User
+from core.responses import user_detail_cache
+from core.tests.base import BaseTestCase
+from core.tokens import issue_access_token
+
+
+class AsyncViewsTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.get(email=self.user)
+        self.headers = {
+            'HTTP_AUTHORIZATION': f'Bearer {issue_access_token(self.owner)}',
+        }
+        self.url = reverse('user-detail', args=[self.owner.id])
+        user_detail_cache.stats.reset()
+
+    def get(self, url, *args, **kwargs):
+        return self.client.get(url, *args, **self.headers, **kwargs)
+
+    def test_countries(self):
+        with self.assertNumQueries(0):
+            response = self.get('/async/countries/', {'q': 'pak'})
+
+        self.assertOK(response)
+        self.assertEqual(
+            response.content,
+            self.get('/countries/', {'q': 'pak'}).content,
+        )
+
+        with self.assertNumQueries(0):
+            response = self.get('/async/countries/PK/')
+
+        self.assertEqual(response.json(), {'code': 'PK', 'name': 'Pakistan'})
+        self.assert404(self.get('/async/countries/XX/'))
+
+    def test_user_detail(self):
+        self.assertOK(self.get(f'/async{self.url}'))
+        with self.assertNumQueries(0):
+            response = self.get(f'/async{self.url}')
+
+        self.assertOK(response)
+        self.assertEqual(response.json(), self.get(self.url).json())
+
+        stats = user_detail_cache.stats.get()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_user_detail_permissions(self):
+        admin = User.objects.get(email=self.admin)
+        self.assert404(self.get(f'/async/users/{admin.id}/'))
+        self.assert404(self.get('/async/users/0/'))
+        self.assert404(self.get('/async/users/abc/'))
+
+    def test_user_list(self):
+        response = self.get('/async/users/')
+        self.assertOK(response)
+        self.assertEqual(
+            response.json()['results'],
+            self.get('/users/').json()['results'],
+        )
+
+    def test_other_authentication(self):
+        self.assert401(self.client.get('/async/users/'))
+        self.assert401(self.client.get('/async/countries/'))
+
+        self.login_user()
+        self.assertOK(self.client.get(f'/async{self.url}'))
+        self.assertOK(self.client.get('/async/countries/'))
+
+    def test_default_user(self):
+        user = User.objects.get(email=SIGNUP_USER)
+        token = issue_access_token(user)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.assert403(self.client.get('/async/users/', **headers))
+
+    def test_revoked_token(self):
+        self.owner.set_password('changed')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.owner.save()
+
+        self.assert401(self.get('/async/countries/'))
+
+    async def test_asgi(self):
+        # The async client takes header names, not WSGI environ keys.
+        response = await AsyncClient().get(
+            '/async/countries/PK/',
+            authorization=self.headers['HTTP_AUTHORIZATION'],
+        )
+        self.assertEqual(response.json(), {'code': 'PK', 'name': 'Pakistan'})
+
+    async def test_cache_off_event_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def cached_credentials(key):
+            threads.append(threading.get_ident())
+            return original(key)
+
+        original = asyncviews.authenticator.cached_credentials
+        with patch.object(
+            asyncviews.authenticator,
+            'cached_credentials',
+            side_effect=cached_credentials,
+        ):
+            response = await AsyncClient().get(
+                '/async/countries/PK/',
+                authorization=self.headers['HTTP_AUTHORIZATION'],
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], loop_thread)
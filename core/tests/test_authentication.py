@@ -0,0 +1,223 @@
+import base64
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import override_settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.authentication import (
+    TokenAuthentication,
+    credential_stats,
+    token_stats,
+    verified_credentials,
+)
+from core.models import SIGNUP_USER, User
+from core.tests.base import BaseTestCase
+from core.tokens import (
+    AccessToken,
+    issue_access_token,
+    revoke_access_tokens,
+    revoked_key,
+)
+
+
+class TokenCacheTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.get(email=self.user)
+        self.token = self.create_token(self.owner)
+        self.auth = TokenAuthentication()
+        token_stats.reset()
+
+    def test_cached_lookup(self):
+        user, token = self.auth.authenticate_credentials(self.token)
+        self.assertEqual(user, self.owner)
+
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token)
+
+        self.assertEqual(user.id, self.owner.id)
+        self.assertEqual(user.email, self.owner.email)
+        self.assertEqual(token.key, self.token)
+
+        stats = token_stats.get()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_deferred_fields(self):
+        self.auth.authenticate_credentials(self.token)
+        user, _ = self.auth.authenticate_credentials(self.token)
+        self.assertEqual(user.date_joined, self.owner.date_joined)
+
+    def test_token_deleted(self):
+        self.auth.authenticate_credentials(self.token)
+        self.owner.auth_token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token)
+
+    def test_user_deactivated(self):
+        self.auth.authenticate_credentials(self.token)
+        self.owner.is_active = False
+        self.owner.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token)
+
+    def test_admin_promotion(self):
+        self.auth.authenticate_credentials(self.token)
+
+        self.login_admin()
+        url = reverse('user-admin', args=[self.owner.id])
+        self.assertOK(self.post_json(url))
+
+        user, _ = self.auth.authenticate_credentials(self.token)
+        self.assertTrue(user.is_staff)
+
+
+class AccessTokenTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.get(email=self.user)
+        self.auth = TokenAuthentication()
+
+    def get_users(self, token):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        return self.client.get(reverse('user-list'), **headers)
+
+    def test_login(self):
+        self.login(SIGNUP_USER)
+        data = dict(username=self.user, password='soccer')
+        response = self.post_json('/login/', data=data)
+        self.assertOK(response)
+
+        data = response.json()
+        self.assertIn('token', data)
+        self.assertIn('expires_in', data)
+        self.client.logout()
+        self.assertOK(self.get_users(data['access']))
+
+    def test_no_db_access(self):
+        access = issue_access_token(self.owner)
+
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(access)
+
+        self.assertIsInstance(token, AccessToken)
+        self.assertEqual(user.id, self.owner.id)
+        self.assertEqual(user.email, self.owner.email)
+        self.assertFalse(user.is_staff)
+
+    def test_tampered(self):
+        access = issue_access_token(self.owner)
+        self.assert401(self.get_users(access[:-1] + 'x'))
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired(self):
+        access = issue_access_token(self.owner)
+        self.assert401(self.get_users(access))
+
+    def test_revoked_on_promotion(self):
+        access = issue_access_token(self.owner)
+
+        self.owner.is_staff = True
+        self.owner.save()
+
+        self.assert401(self.get_users(access))
+        self.assertOK(self.get_users(issue_access_token(self.owner)))
+
+    def test_revoked_after_expiry(self):
+        revoke_access_tokens([self.owner.id])
+        access = issue_access_token(self.owner)
+        self.assertOK(self.get_users(access))
+
+        # The first revocation expires before the second one.
+        cache.delete(revoked_key(self.owner.id))
+        revoke_access_tokens([self.owner.id])
+        self.assert401(self.get_users(access))
+
+    def test_not_revoked_on_name_change(self):
+        access = issue_access_token(self.owner)
+
+        self.owner.first_name = 'John'
+        self.owner.save()
+
+        self.assertOK(self.get_users(access))
+
+    def test_revoked_on_token_delete(self):
+        self.create_token(self.owner)
+        access = issue_access_token(self.owner)
+        self.owner.auth_token.delete()
+        self.assert401(self.get_users(access))
+
+    def test_refresh(self):
+        token = self.create_token(self.owner)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        response = self.client.post('/login/refresh/', **headers)
+        self.assertOK(response)
+        self.assertOK(self.get_users(response.json()['access']))
+
+    def test_refresh_with_access_token(self):
+        access = issue_access_token(self.owner)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+        response = self.client.post('/login/refresh/', **headers)
+        self.assert403(response)
+
+    def test_refresh_unauth(self):
+        response = self.client.post('/login/refresh/')
+        self.assert401(response)
+
+
+class BasicAuthTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.get(email=self.user)
+        credential_stats.reset()
+
+    def get_user(self, password):
+        credentials = f'{self.user}:{password}'.encode()
+        encoded = base64.b64encode(credentials).decode()
+        headers = {'HTTP_AUTHORIZATION': f'Basic {encoded}'}
+        url = reverse('user-detail', args=[self.owner.id])
+        return self.client.get(url, **headers)
+
+    def test_cached_credentials(self):
+        self.assertOK(self.get_user('soccer'))
+
+        with patch('core.hashing.check_password') as mock_check:
+            self.assertOK(self.get_user('soccer'))
+            mock_check.assert_not_called()
+
+        stats = credential_stats.get()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_shared_cache(self):
+        self.assertOK(self.get_user('soccer'))
+        verified_credentials.clear()
+
+        with patch('core.hashing.check_password') as mock_check:
+            self.assertOK(self.get_user('soccer'))
+            mock_check.assert_not_called()
+
+    def test_wrong_password(self):
+        self.assertOK(self.get_user('soccer'))
+        self.assert401(self.get_user('hockey'))
+
+    def test_password_change(self):
+        self.assertOK(self.get_user('soccer'))
+
+        self.login_user()
+        url = reverse('user-detail', args=[self.owner.id])
+        self.assertOK(self.patch_json(url, data={'password': 'hockey'}))
+        self.client.logout()
+
+        self.assertEqual(len(verified_credentials), 0)
+        self.assert401(self.get_user('soccer'))
+        self.assertOK(self.get_user('hockey'))
+
+    def test_inactive(self):
+        self.assertOK(self.get_user('soccer'))
+        User.objects.filter(id=self.owner.id).update(is_active=False)
+        self.assert401(self.get_user('soccer'))
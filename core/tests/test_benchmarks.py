@@ -0,0 +1,277 @@
+import hashlib
+import operator
+import os
+import subprocess
+import sys
+import unittest
+from functools import reduce
+
+import pycountry
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.fastserializers import ListPlan
+from core.filters import TrigramSearchFilter
+from core.lib import (
+    get_fake_profiles,
+    get_random_countries,
+    get_random_country,
+)
+from core.models import EmailVerification, User
+from core.serializers import UserAdminSerializer
+from core.tasks import send_verification_email
+from core.tests.base import BaseTestCase
+from core.tests.benchmark import BenchmarkMixin, bench
+from core.views import CountryViewSet, UserViewSet
+
+LEGACY_COUNTRIES = [(c.alpha_2, c.name) for c in pycountry.countries]
+
+
+class LegacyCountryViewSet(CountryViewSet):
+    def list(self, request, *args, **kwargs):
+        countries = []
+        for code, name in sorted(LEGACY_COUNTRIES, key=lambda x: x[1]):
+            countries.append(dict(
+                code=code,
+                name=name,
+            ))
+
+        return Response(countries)
+
+
+class CountryListBenchmark(BenchmarkMixin, BaseTestCase):
+    def get(self, viewset, **headers):
+        factory = APIRequestFactory()
+        view = viewset.as_view({'get': 'list'})
+        user = User.objects.get(email=self.user)
+
+        def call():
+            request = factory.get('/countries/', **headers)
+            force_authenticate(request, user=user)
+            response = view(request)
+            if hasattr(response, 'render'):
+                response.render()
+
+            return response
+
+        return call
+
+    def test_list(self):
+        legacy = self.get(LegacyCountryViewSet)
+        current = self.get(CountryViewSet)
+        self.assertEqual(legacy().content, current().content)
+
+        self.report('countries list', bench(legacy), bench(current))
+
+    def test_list_not_modified(self):
+        legacy = self.get(LegacyCountryViewSet)
+        etag = self.get(CountryViewSet)()['ETag']
+        current = self.get(CountryViewSet, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(current().status_code, 304)
+
+        self.report('countries 304', bench(legacy), bench(current))
+
+
+class StartupBenchmark(BenchmarkMixin, BaseTestCase):
+    STARTUP = (
+        'import sys, time\n'
+        'start = time.perf_counter()\n'
+        'import django\n'
+        'django.setup()\n'
+        'import core.lib, core.views\n'
+        '{extra}'
+        'print(time.perf_counter() - start, "pycountry" in sys.modules)\n'
+    )
+    LEGACY = (
+        'import pycountry\n'
+        '[(c.alpha_2, c.name) for c in pycountry.countries]\n'
+    )
+
+    def run_startup(self, extra=''):
+        code = self.STARTUP.format(extra=extra)
+        timings = []
+        for _ in range(3):
+            output = subprocess.check_output([sys.executable, '-c', code])
+            elapsed, loaded = output.decode().split()
+            timings.append(float(elapsed))
+
+        return min(timings), loaded == 'True'
+
+    def test_startup(self):
+        before, _ = self.run_startup(self.LEGACY)
+        after, loaded = self.run_startup()
+        self.assertFalse(loaded)
+
+        self.report('startup', before, after, unit='ms')
+
+
+class RandomCountryBenchmark(BenchmarkMixin, BaseTestCase):
+    COUNT = 100000
+
+    def test_random_countries(self):
+        def legacy():
+            return [get_random_country() for _ in range(self.COUNT)]
+
+        def batch():
+            return get_random_countries(self.COUNT)
+
+        before = bench(legacy, number=1, repeat=3)
+        after = bench(batch, number=1, repeat=3)
+        self.report(f'{self.COUNT} countries', before, after, unit='ms')
+
+
+class UserListBenchmark(BenchmarkMixin, BaseTestCase):
+    COUNT = 1000
+
+    def test_serialize(self):
+        profiles = get_fake_profiles(self.COUNT, seed=1)
+        User.objects.bulk_create([User(**profile) for profile in profiles])
+        queryset = User.objects.order_by('-date_joined', '-id')[:self.COUNT]
+
+        request = Request(APIRequestFactory().get('/users/'))
+        context = {'request': request, 'format': None}
+
+        def legacy():
+            serializer = UserAdminSerializer(
+                queryset.all(),
+                many=True,
+                context=context,
+            )
+            return serializer.data
+
+        def fast():
+            plan = ListPlan.compile(UserAdminSerializer(context=context))
+            return plan.render(plan.values(queryset.all()))
+
+        before = bench(legacy, number=1, repeat=3)
+        after = bench(fast, number=1, repeat=3)
+        self.report(f'serialize {self.COUNT} users', before, after, unit='ms')
+        sys.stderr.write(
+            f'{self.COUNT / before:.0f} -> {self.COUNT / after:.0f} rows/s\n'
+        )
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'needs pg_trgm')
+class UserSearchBenchmark(BenchmarkMixin, BaseTestCase):
+    COUNT = int(os.environ.get('SEARCH_BENCHMARK_USERS', 1000000))
+    INSERT = """
+        INSERT INTO core_user (
+            password, is_superuser, username, email, first_name, last_name,
+            is_staff, is_active, date_joined
+        )
+        SELECT
+            '', false, 'user' || i || '@example.com',
+            'user' || i || '@example.com',
+            substr(md5(i::text), 1, 8), substr(md5((i * 7)::text), 1, 10),
+            false, true, now() - i * interval '1 second'
+        FROM generate_series(1, %s) AS i
+    """
+
+    def setUp(self):
+        super().setUp()
+        with connection.cursor() as cursor:
+            cursor.execute(self.INSERT, [self.COUNT])
+            cursor.execute('ANALYZE core_user')
+
+    def test_search(self):
+        query = hashlib.md5(b'12345').hexdigest()[:8]
+        request = Request(APIRequestFactory().get('/', {'search': query}))
+        queryset = User.objects.order_by('-date_joined', '-id')
+        fields = UserViewSet.search_fields
+
+        def legacy():
+            lookups = [Q(**{f'{f}__icontains': query}) for f in fields]
+            return list(queryset.filter(reduce(operator.or_, lookups))[:20])
+
+        def trigram():
+            search = TrigramSearchFilter().filter_queryset(
+                request,
+                queryset,
+                UserViewSet,
+            )
+            return list(search[:20])
+
+        self.assertEqual(
+            {user.id for user in legacy()},
+            {user.id for user in trigram()},
+        )
+
+        search = TrigramSearchFilter().filter_queryset(
+            request,
+            queryset,
+            UserViewSet,
+        )
+        self.assertIn('trgm_idx', search.explain())
+
+        before = bench(legacy, number=3, repeat=3)
+        after = bench(trigram, number=10, repeat=3)
+        self.report(f'search {self.COUNT} users', before, after, unit='ms')
+
+
+class VerificationMessageBenchmark(BenchmarkMixin, BaseTestCase):
+    def test_build(self):
+        user = User.objects.get(email=self.user)
+        verification = user.get_email_verification()
+        context = {'verification_link': 'http://x/', 'name': 'John'}
+
+        def legacy():
+            html_message = render_to_string('email/welcome.html', context)
+            msg = EmailMultiAlternatives(
+                'Welcome to Fantasy Soccer League',
+                strip_tags(html_message),
+                'from@example.com',
+                [user.email],
+            )
+            msg.attach_alternative(html_message, 'text/html')
+            return msg.message()
+
+        def current():
+            return verification.build_verification_message().message()
+
+        before = bench(legacy, number=200)
+        after = bench(current, number=200)
+        self.report('verification message', before, after)
+        sys.stderr.write(f'{1 / before:.0f} -> {1 / after:.0f} messages/s\n')
+
+
+class VerificationTaskBenchmark(BenchmarkMixin, BaseTestCase):
+    COUNT = 500
+
+    def test_throughput(self):
+        profiles = get_fake_profiles(self.COUNT, seed=1)
+        User.objects.bulk_create([User(**profile) for profile in profiles])
+        users = list(User.objects.all())
+        for user in users:
+            user.get_email_verification()
+
+        ids = [user.id for user in users]
+
+        def legacy():
+            # One task per id, each loading its own user.
+            for user_id in ids:
+                user = User.objects.get(id=user_id)
+                verification, _ = EmailVerification.objects.get_or_create(
+                    user=user,
+                    defaults={'code': 'x'},
+                )
+                verification.send_verification_link()
+
+        def batched():
+            # What the batch worker runs for the same tasks.
+            size = settings.EMAIL_BATCH_SIZE
+            for start in range(0, len(ids), size):
+                send_verification_email.run(ids[start:start + size])
+
+        before = bench(legacy, number=1, repeat=3)
+        after = bench(batched, number=1, repeat=3)
+        self.report(f'{len(ids)} verification tasks', before, after, unit='ms')
+        sys.stderr.write(
+            f'{len(ids) / before:.0f} -> {len(ids) / after:.0f} tasks/s\n'
+        )
@@ -1,11 +1,27 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
 from unittest.mock import patch
 
 from django.core import mail
+from django.db import DatabaseError, connection
 from django.shortcuts import reverse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from faker import Faker
 from rest_framework.authtoken.models import Token
-
-from core.models import SIGNUP_USER, User
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.authentication import TokenAuthentication
+from core.fastserializers import ListPlan
+from core.models import SIGNUP_USER, OutboxMessage, User
+from core.responses import user_detail_cache
+from core.serializers import UserAdminSerializer, UserSerializer
 from core.tasks import send_verification_email
 from core.tests.base import BaseTestCase
 
@@ -43,6 +59,52 @@ class UserTestCase(BaseTestCase):
         self.assertOK(response)
         data = response.json()
         self.assertEqual(data['count'], 3)
+        self.assertTrue(data['count_is_exact'])
+
+    @patch('core.pagination.EstimatedCountPaginator.estimate')
+    def test_list_admin_estimated(self, mock_estimate):
+        mock_estimate.return_value = 10 ** 7
+        self.login_admin()
+        url = reverse('user-list')
+        response = self.client.get(url)
+        self.assertOK(response)
+        data = response.json()
+        self.assertEqual(data['count'], 10 ** 7)
+        self.assertFalse(data['count_is_exact'])
+        self.assertEqual(len(data['results']), 3)
+
+    @override_settings(PAGINATION_EXACT_COUNT_THRESHOLD=1)
+    @patch('core.pagination.EstimatedCountPagination.page_size', 1)
+    @patch('core.pagination.EstimatedCountPaginator.estimate')
+    def test_list_admin_underestimated(self, mock_estimate):
+        # Rows added since the last ANALYZE aren't in the estimate.
+        mock_estimate.return_value = 1
+        self.login_admin()
+        url = reverse('user-list')
+
+        urls = []
+        for page in (1, 2, 3):
+            data = self.client.get(url, {'page': page}).json()
+            self.assertFalse(data['count_is_exact'])
+            self.assertEqual(len(data['results']), 1)
+            urls.append(data['results'][0]['url'])
+            if page < 3:
+                self.assertIsNotNone(data['next'])
+            else:
+                self.assertIsNone(data['next'])
+
+        self.assertEqual(len(set(urls)), 3)
+        self.assert404(self.client.get(url, {'page': 4}))
+        self.assert404(self.client.get(url, {'page': 'x'}))
+
+    @patch('core.pagination.EstimatedCountPaginator.estimate')
+    def test_list_admin_below_threshold(self, mock_estimate):
+        mock_estimate.return_value = 10
+        self.login_admin()
+        url = reverse('user-list')
+        data = self.client.get(url).json()
+        self.assertEqual(data['count'], 3)
+        self.assertTrue(data['count_is_exact'])
 
     def test_list_auth(self):
         self.login_user()
@@ -121,11 +183,542 @@ class UserTestCase(BaseTestCase):
     def test_send_link_action(self):
         self.login_admin()
         user = User.objects.get(email=self.user)
-        self.assertEqual(len(mail.outbox), 0)
         url = reverse('user-start-email-verification', args=[user.id])
         response = self.post_json(url)
+        self.assertEqual(response.status_code, 202)
+
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task, send_verification_email.name)
+        self.assertEqual(message.args, [user.id])
+
+        response = self.post_json(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_send_link_enqueue_failure(self):
+        self.login_admin()
+        user = User.objects.get(email=self.user)
+        url = reverse('user-start-email-verification', args=[user.id])
+        enqueue = patch('core.views.outbox.enqueue', side_effect=DatabaseError)
+        with enqueue, self.assertRaises(DatabaseError):
+            self.post_json(url)
+
+        response = self.post_json(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+
+class SparseFieldsTestCase(BaseTestCase):
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+
         self.assertOK(response)
-        self.assertEqual(len(mail.outbox), 1)
+        sql = [query['sql'] for query in context.captured_queries]
+        select = [q for q in sql if 'FROM "core_user"' in q][-1]
+        return response.json(), select
+
+    def test_fields(self):
+        self.login_admin()
+        data, sql = self.get(reverse('user-list'), fields='id,email')
+        for user in data['results']:
+            self.assertEqual(set(user), {'email'})
+
+        self.assertNotIn('first_name', sql)
+        self.assertNotIn('password', sql)
+
+    def test_exclude(self):
+        self.login_admin()
+        data, sql = self.get(reverse('user-list'), exclude='url,username')
+        for user in data['results']:
+            self.assertEqual(set(user), {'email', 'first_name', 'last_name'})
+
+        self.assertNotIn('username', sql)
+
+    def test_retrieve(self):
+        user = self.login_user()
+        url = reverse('user-detail', args=[user.id])
+        data, sql = self.get(url, fields='url')
+        self.assertEqual(set(data), {'url'})
+        self.assertNotIn('email', sql)
+
+    def test_update_ignores_fields(self):
+        user = self.login_user()
+        url = reverse('user-detail', args=[user.id]) + '?fields=email'
+        response = self.patch_json(url, data={'first_name': 'John'})
+        self.assertOK(response)
+        self.assertEqual(response.json()['first_name'], 'John')
+
+
+class DetailCacheTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.get(email=self.user)
+        self.url = reverse('user-detail', args=[self.owner.id])
+        user_detail_cache.stats.reset()
+
+    def test_hit(self):
+        self.login_user()
+        with CaptureQueriesContext(connection) as miss:
+            first = self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as hit:
+            second = self.client.get(self.url)
+
+        self.assertOK(second)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(hit), len(miss) - 1)
+
+        stats = user_detail_cache.stats.get()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_variants(self):
+        self.login_user()
+        self.client.get(self.url)
+        data = self.client.get(self.url, {'fields': 'email'}).json()
+        self.assertEqual(set(data), {'email'})
+
+        self.login_admin()
+        data = self.client.get(self.url).json()
+        self.assertIn('username', data)
+
+    def test_update(self):
+        self.login_user()
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patch_json(self.url, {'first_name': 'John'})
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['first_name'], 'John')
+
+    def test_bulk_update(self):
+        self.login_admin()
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.patch_json(reverse('user-bulk-update'), {
+                'ids': [self.owner.id],
+                'data': {'last_name': 'Doe'},
+            })
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['last_name'], 'Doe')
+
+    def test_admin(self):
+        version = user_detail_cache.get_version(self.owner.id)
+        self.login_admin()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_json(reverse('user-admin', args=[self.owner.id]))
+
+        new_version = user_detail_cache.get_version(self.owner.id)
+        self.assertNotEqual(new_version, version)
+
+    def test_permission(self):
+        self.login_admin()
+        self.assertOK(self.client.get(self.url))
+
+        other = User.objects.create(username='other@example.com')
+        self.client.force_login(other)
+        self.assert404(self.client.get(self.url))
+        url = reverse('user-detail', args=[f'0{self.owner.id}'])
+        self.assert404(self.client.get(url))
+
+
+class SearchTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        for email, first_name, last_name in [
+            ('jsmith@example.com', 'John', 'Smith'),
+            ('smithers@example.com', 'Waylon', 'Smithers'),
+            ('jane@example.com', 'Jane', 'Doe'),
+            ('under_score@example.com', '', ''),
+        ]:
+            User.objects.create(
+                username=email,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+            )
+
+    def search(self, query):
+        response = self.client.get('/users/', {'search': query})
+        self.assertOK(response)
+        return [user['email'] for user in response.json()['results']]
+
+    def test_search(self):
+        self.login_admin()
+        self.assertEqual(
+            self.search('smith'),
+            ['jsmith@example.com', 'smithers@example.com'],
+        )
+        self.assertEqual(self.search('smithers'), ['smithers@example.com'])
+        self.assertEqual(self.search('JANE'), ['jane@example.com'])
+
+    def test_terms(self):
+        self.login_admin()
+        self.assertEqual(self.search('john smith'), ['jsmith@example.com'])
+        self.assertEqual(self.search('jane smith'), [])
+
+    def test_wildcards(self):
+        self.login_admin()
+        self.assertEqual(self.search('e_e'), [])
+        self.assertEqual(self.search('e%e'), [])
+        self.assertEqual(self.search('r_s'), ['under_score@example.com'])
+
+    def test_short(self):
+        self.login_admin()
+        response = self.client.get('/users/', {'search': 'jo wa'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('search', response.json())
+
+        self.assertEqual(self.search('wa smith'), ['smithers@example.com'])
+        self.assertEqual(self.search('xy smith'), [])
+
+    def test_non_staff(self):
+        self.login_user()
+        self.assertEqual(self.search('smith'), [])
+        self.assertEqual(self.search('owner'), [self.user])
+
+
+class ListPlanTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        for _ in range(5):
+            email = fake.unique.email()
+            User.objects.create(
+                email=email,
+                username=email,
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+            )
+
+    def assertParity(self, serializer_class, path='/users/'):
+        request = Request(APIRequestFactory().get(path))
+        context = {'request': request, 'format': None}
+        queryset = User.objects.order_by('-date_joined', '-id')
+
+        expected = serializer_class(queryset, many=True, context=context).data
+        plan = ListPlan.compile(serializer_class(context=context))
+        data = plan.render(plan.values(queryset))
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_admin_serializer(self):
+        self.assertParity(UserAdminSerializer)
+
+    def test_user_serializer(self):
+        self.assertParity(UserSerializer)
+
+    def test_sparse_fields(self):
+        self.assertParity(UserAdminSerializer, '/users/?fields=url,email')
+        self.assertParity(UserSerializer, '/users/?exclude=url')
+
+    def test_format_suffix(self):
+        request = Request(APIRequestFactory().get('/users/'))
+        context = {'request': request, 'format': 'json'}
+        self.assertIsNone(ListPlan.compile(UserSerializer(context=context)))
+
+
+class KeysetPaginationTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # Pairs of users share a date_joined to exercise the id tie-breaker.
+        User.objects.bulk_create([
+            User(
+                email=f'user{i}@example.com',
+                username=f'user{i}@example.com',
+                date_joined=now - timedelta(seconds=i // 2),
+            )
+            for i in range(25)
+        ])
+        self.expected = list(
+            User.objects.order_by('-date_joined', '-id').values_list(
+                'email',
+                flat=True,
+            )
+        )
+        self.login_admin()
+
+    def get_page(self, url):
+        response = self.client.get(url)
+        self.assertOK(response)
+        data = response.json()
+        self.assertNotIn('count', data)
+        return data
+
+    def test_forward(self):
+        url = reverse('user-list') + '?pagination=cursor'
+        emails = []
+        previous = None
+        while url:
+            data = self.get_page(url)
+            if emails:
+                self.assertIsNotNone(data['previous'])
+            else:
+                self.assertIsNone(data['previous'])
+
+            emails += [user['email'] for user in data['results']]
+            previous, url = data['previous'], data['next']
+
+        self.assertEqual(emails, self.expected)
+
+        emails = []
+        while previous:
+            data = self.get_page(previous)
+            emails = [user['email'] for user in data['results']] + emails
+            previous = data['previous']
+
+        self.assertEqual(emails, self.expected[:len(emails)])
+        self.assertEqual(len(emails), 20)
+
+    def test_invalid_cursor(self):
+        url = reverse('user-list') + '?cursor=invalid'
+        self.assert404(self.client.get(url))
+
+
+class ExportTestCase(BaseTestCase):
+    def export(self, **params):
+        response = self.client.get(reverse('user-export'), params)
+        self.assertOK(response)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        self.login_admin()
+        content = self.export()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertIn('date_joined', rows[0])
+        self.assertNotIn('password', rows[0])
+
+    def test_csv(self):
+        self.login_admin()
+        content = self.export(type='csv', fields='id,email')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['id', 'email'])
+        self.assertEqual(len(rows), 4)
+        self.assertIn(self.user, [row[1] for row in rows])
+
+    def test_date_range(self):
+        self.login_admin()
+        owner = User.objects.get(email=self.user)
+        owner.date_joined = timezone.now() - timedelta(days=10)
+        owner.save()
+
+        after = (timezone.now() - timedelta(days=11)).isoformat()
+        before = (timezone.now() - timedelta(days=9)).isoformat()
+        content = self.export(joined_after=after, joined_before=before)
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['email'] for row in rows], [self.user])
+
+    def test_unknown_field(self):
+        self.login_admin()
+        params = {'fields': 'email,password'}
+        response = self.client.get(reverse('user-export'), params)
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_admin(self):
+        self.login_user()
+        response = self.client.get(reverse('user-export'))
+        self.assert403(response)
+
+
+class BulkCreateTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('user-bulk-create')
+
+    def test_json(self):
+        self.login_admin()
+        rows = [
+            {'email': 'a@example.com', 'password': 'test123'},
+            {'email': 'b@example.com', 'password': 'test123',
+             'first_name': 'John'},
+            {'email': 'invalid', 'password': 'test123'},
+            {'email': self.user, 'password': 'test123'},
+            {'email': 'a@example.com', 'password': 'test123'},
+            'not an object',
+        ]
+        response = self.post_json(self.url, rows)
+
+        self.assertOK(response)
+        data = response.json()
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(data['failed'], 4)
+
+        statuses = [result['status'] for result in data['results']]
+        self.assertEqual(statuses, ['created'] * 2 + ['failed'] * 4)
+        self.assertIn('email', data['results'][2]['errors'])
+        self.assertIn('email', data['results'][3]['errors'])
+        self.assertIn('email', data['results'][4]['errors'])
+
+        user = User.objects.get(email='b@example.com')
+        self.assertEqual(user.username, 'b@example.com')
+        self.assertEqual(user.first_name, 'John')
+        self.assertTrue(user.check_password('test123'))
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_ndjson(self):
+        self.login_admin()
+        lines = [
+            json.dumps({'email': f'user{i}@example.com', 'password': 'x'})
+            for i in range(5)
+        ]
+        body = '\n'.join(lines) + '\n'
+        response = self.client.post(
+            self.url,
+            body,
+            content_type='application/x-ndjson',
+        )
+
+        self.assertOK(response)
+        self.assertEqual(response.json()['created'], 5)
+        rows = [result['row'] for result in response.json()['results']]
+        self.assertEqual(rows, list(range(5)))
+
+    def test_ndjson_invalid(self):
+        self.login_admin()
+        response = self.client.post(
+            self.url,
+            '{"email": "a@example.com", "password": "x"}\nnot json\n',
+            content_type='application/x-ndjson',
+        )
+        self.assertOK(response)
+        results = response.json()['results']
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertEqual(results[1]['status'], 'failed')
+
+    def test_not_a_list(self):
+        self.login_admin()
+        for data in [{'email': 'a@example.com'}, 123, 'a@example.com']:
+            response = self.post_json(self.url, data)
+            self.assertEqual(response.status_code, 400)
+
+    @override_settings(BULK_CREATE_MAX_ROWS=2)
+    def test_too_many(self):
+        self.login_admin()
+        lines = [
+            json.dumps({'email': f'user{i}@example.com', 'password': 'x'})
+            for i in range(3)
+        ]
+        response = self.client.post(
+            self.url,
+            '\n'.join(lines),
+            content_type='application/x-ndjson',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(email='user0@example.com'))
+
+    def test_non_admin(self):
+        self.login(SIGNUP_USER)
+        response = self.post_json(self.url, [])
+        self.assert403(response)
+
+
+class BulkUpdateTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('user-bulk-update')
+        self.users = [
+            User.objects.create(username=email, email=email)
+            for email in ['a@example.com', 'b@example.com', 'c@example.com']
+        ]
+        self.ids = [user.id for user in self.users]
+
+    def test_ids(self):
+        self.login_admin()
+        response = self.patch_json(self.url, {
+            'ids': self.ids[:2],
+            'data': {'first_name': 'John', 'password': 'test123'},
+        })
+        self.assertOK(response)
+        self.assertEqual(response.json(), {'updated': 2, 'counts': [2]})
+
+        users = User.objects.filter(id__in=self.ids[:2])
+        self.assertEqual({user.first_name for user in users}, {'John'})
+        self.assertTrue(all(user.check_password('test123') for user in users))
+        self.assertEqual(User.objects.get(id=self.ids[2]).first_name, '')
+
+    def test_change_sets(self):
+        self.login_admin()
+        response = self.patch_json(self.url, [
+            {'ids': self.ids, 'data': {'first_name': 'John'}},
+            {'is_staff': False, 'data': {'last_name': 'Doe'}},
+        ])
+        self.assertOK(response)
+        self.assertEqual(response.json()['counts'], [3, 5])
+
+        owner = User.objects.get(email=self.user)
+        self.assertEqual(owner.first_name, '')
+        self.assertEqual(owner.last_name, 'Doe')
+        self.assertEqual(User.objects.get(email=self.admin).last_name, '')
+
+    def test_invalid(self):
+        self.login_admin()
+        response = self.patch_json(self.url, [
+            {'data': {'first_name': 'John'}},
+            {'ids': self.ids, 'data': {'email': 'new@example.com'}},
+            {'ids': self.ids, 'data': {}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertIn('non_field_errors', errors[0])
+        self.assertIn('email', errors[1]['data'])
+        self.assertIn('data', errors[2])
+        self.assertFalse(User.objects.filter(first_name='John').exists())
+
+    @override_settings(BULK_UPDATE_MAX_IDS=3)
+    def test_too_many(self):
+        self.login_admin()
+        response = self.patch_json(self.url, [
+            {'ids': self.ids, 'data': {'first_name': 'John'}},
+            {'is_staff': False, 'data': {'last_name': 'Doe'}},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.filter(first_name='John').exists())
+
+    def test_non_staff(self):
+        owner = self.login_user()
+        response = self.patch_json(self.url, {
+            'ids': [owner.id, *self.ids],
+            'data': {'first_name': 'John'},
+        })
+        self.assertOK(response)
+        self.assertEqual(response.json()['updated'], 1)
+        owner.refresh_from_db()
+        self.assertEqual(owner.first_name, 'John')
+
+    def test_token_cache(self):
+        token = self.create_token(self.users[0])
+        auth = TokenAuthentication()
+        auth.authenticate_credentials(token)
+
+        self.login_admin()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_json(reverse('user-bulk-admin'), {
+                'ids': self.ids,
+            })
+
+        self.assertOK(response)
+        self.assertEqual(response.json(), {'updated': 3})
+        user, _ = auth.authenticate_credentials(token)
+        self.assertTrue(user.is_staff)
+
+    def test_bulk_admin_filter(self):
+        self.login_admin()
+        response = self.post_json(reverse('user-bulk-admin'), {
+            'is_staff': False,
+        })
+        self.assertOK(response)
+        self.assertFalse(User.objects.filter(is_staff=False).exists())
+
+    def test_bulk_admin_non_admin(self):
+        self.login_user()
+        response = self.post_json(reverse('user-bulk-admin'), {
+            'ids': self.ids,
+        })
+        self.assert403(response)
 
 
 class VerifyTestCase(BaseTestCase):
@@ -134,15 +727,9 @@ class VerifyTestCase(BaseTestCase):
         email = 'test@example.com'
         data = {'email': email, 'password': 'test123'}
 
-        with patch('core.serializers.send_verification_email.delay') as mock_delay:  # noqa
-            def send_email(*args, **kwargs):
-                user = User.objects.get(email=email)
-                send_verification_email(user.id)
-
-            mock_delay.side_effect = send_email
-
-            with self.captureOnCommitCallbacks(execute=True):
-                self.post_json(reverse('user-signup'), data)
+        self.post_json(reverse('user-signup'), data)
+        self.assertEqual(self.drain_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
 
         user = User.objects.get(email=email)
         self.assertFalse(user.email_verification.is_verified)
@@ -157,6 +744,44 @@ class VerifyTestCase(BaseTestCase):
         user.email_verification.refresh_from_db()
         self.assertTrue(user.email_verification.is_verified)
 
+    def get_verification_url(self, user, code):
+        url_name = 'user-complete-email-verification'
+        return reverse(url_name, args=[user.id, code])
+
+    def test_verify_single_query(self):
+        user = User.objects.get(email=self.user)
+        verification = user.get_email_verification()
+        url = self.get_verification_url(user, verification.code)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 201)
+        verification.refresh_from_db()
+        self.assertTrue(verification.is_verified)
+
+        # Already verified: no write, same response.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_verify_wrong_code(self):
+        user = User.objects.get(email=self.user)
+        verification = user.get_email_verification()
+        user.verify_email(verification.code)
+
+        response = self.client.get(self.get_verification_url(user, 'wrong'))
+        self.assert404(response)
+        verification.refresh_from_db()
+        self.assertTrue(verification.is_verified)
+
+        url = reverse(
+            'user-complete-email-verification',
+            args=[0, verification.code],
+        )
+        self.assert404(self.client.get(url))
+
 
 class SignupTestCase(BaseTestCase):
     def test_signup_success(self):
@@ -197,3 +822,108 @@ class SignupTestCase(BaseTestCase):
         self.assertOK(response)
 
         self.assertEqual(User.objects.all().count(), 4)
+
+
+class CountryTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.login_user()
+        self.url = reverse('countries-list')
+
+    def test_list(self):
+        response = self.client.get(self.url)
+        self.assertOK(response)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        data = response.json()
+        self.assertGreater(len(data), 200)
+        self.assertEqual(set(data[0]), {'code', 'name'})
+        names = [country['name'] for country in data]
+        self.assertEqual(names, sorted(names))
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+
+        body = gzip.decompress(response.content)
+        self.assertEqual(json.loads(body), plain.json())
+
+        response = self.client.get(
+            self.url,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=plain['ETag'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzip_quality(self):
+        for accept_encoding, gzipped in [
+            ('gzip;q=0', False),
+            ('br, gzip; q=0.0', False),
+            ('*;q=0.5', True),
+            ('gzip;q=0, *', False),
+            ('deflate, gzip;q=0.8', True),
+            ('identity', False),
+        ]:
+            response = self.client.get(
+                self.url,
+                HTTP_ACCEPT_ENCODING=accept_encoding,
+            )
+            self.assertEqual(
+                response.get('Content-Encoding') == 'gzip',
+                gzipped,
+                accept_encoding,
+            )
+
+    def search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertOK(response)
+        return [country['code'] for country in response.json()]
+
+    def test_search_prefix(self):
+        codes = self.search('pak')
+        self.assertEqual(codes[0], 'PK')
+
+        codes = self.search('united')
+        self.assertIn('US', codes)
+        self.assertIn('GB', codes)
+
+    def test_search_word_prefix(self):
+        self.assertIn('US', self.search('states'))
+
+    def test_search_substring(self):
+        codes = self.search('stan')
+        self.assertIn('PK', codes)
+        self.assertIn('AF', codes)
+
+    def test_search_code(self):
+        self.assertEqual(self.search('PK')[0], 'PK')
+        self.assertIn('DE', self.search('deu'))
+
+    def test_search_no_match(self):
+        self.assertEqual(self.search('zzzz'), [])
+
+    def test_retrieve(self):
+        url = reverse('countries-detail', args=['pk'])
+        response = self.client.get(url)
+        self.assertOK(response)
+        self.assertEqual(response.json(), {'code': 'PK', 'name': 'Pakistan'})
+
+        url = reverse('countries-detail', args=['PAK'])
+        self.assertEqual(self.client.get(url).json()['code'], 'PK')
+
+    def test_retrieve_not_found(self):
+        url = reverse('countries-detail', args=['XX'])
+        self.assert404(self.client.get(url))
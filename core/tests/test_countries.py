@@ -0,0 +1,37 @@
+from django.test import SimpleTestCase
+
+from core.countries import CountryRegistry
+from core.lib import get_random_country
+from core.models import COUNTRIES
+
+
+class CountryRegistryTestCase(SimpleTestCase):
+    def test_lazy(self):
+        registry = CountryRegistry()
+        self.assertFalse(registry.loaded)
+        self.assertGreater(len(registry), 200)
+        self.assertTrue(registry.loaded)
+
+    def test_sorted(self):
+        names = [country.name for country in COUNTRIES]
+        self.assertEqual(names, sorted(names))
+
+    def test_get(self):
+        country = COUNTRIES.get('PK')
+        self.assertEqual(country.name, 'Pakistan')
+        self.assertIs(COUNTRIES.get('pak'), country)
+        self.assertIs(COUNTRIES[COUNTRIES.index_of('PK')], country)
+        self.assertIsNone(COUNTRIES.get('XX'))
+
+    def test_choices(self):
+        self.assertIn(('PK', 'Pakistan'), COUNTRIES.choices())
+
+    def test_random_country(self):
+        self.assertIsNotNone(COUNTRIES.get(get_random_country()))
+
+    def test_search(self):
+        codes = [country.code for country in COUNTRIES.search('Pak')]
+        self.assertEqual(codes, ['PK'])
+
+    def test_search_empty(self):
+        self.assertEqual(len(COUNTRIES.search(' ')), len(COUNTRIES))
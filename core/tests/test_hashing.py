@@ -0,0 +1,66 @@
+from django.contrib.auth.hashers import make_password
+from django.shortcuts import reverse
+from django.test import override_settings
+
+from core import hashing
+from core.models import SIGNUP_USER, User
+from core.tests.base import BaseTestCase
+
+
+class HashingTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        hashing.stats.reset()
+
+    def test_make_password(self):
+        encoded = hashing.make_password('soccer')
+        self.assertTrue(hashing.check_password('soccer', encoded))
+        self.assertFalse(hashing.check_password('hockey', encoded))
+        self.assertEqual(hashing.stats.calls, 3)
+
+    def test_make_passwords(self):
+        passwords = [f'password{i}' for i in range(5)]
+        encoded = hashing.make_passwords(passwords)
+        self.assertEqual(len(encoded), 5)
+        for password, value in zip(passwords, encoded):
+            self.assertTrue(hashing.check_password(password, value))
+
+        self.assertEqual(hashing.make_passwords([]), [])
+
+    def test_user_password(self):
+        user = User.objects.get(email=self.user)
+        self.assertTrue(user.check_password('soccer'))
+
+        user.set_password('hockey')
+        self.assertTrue(user.check_password('hockey'))
+        self.assertFalse(user.check_password('soccer'))
+
+    def test_upgrade_hash(self):
+        user = User.objects.get(email=self.user)
+        user.password = make_password('soccer', hasher='pbkdf2_sha1')
+        user.save()
+
+        self.assertTrue(user.check_password('soccer'))
+        user.refresh_from_db()
+        self.assertFalse(hashing.must_update(user.password))
+
+    @override_settings(PASSWORD_HASHING_QUEUE_TIMEOUT=0)
+    def test_busy(self):
+        slots = hashing.get_slots()
+        taken = 0
+        while slots.acquire(blocking=False):
+            taken += 1
+
+        try:
+            with self.assertRaises(hashing.HashingUnavailable):
+                hashing.make_password('soccer')
+
+            self.login(SIGNUP_USER)
+            data = {'email': 'test@example.com', 'password': 'test123'}
+            response = self.post_json(reverse('user-signup'), data)
+            self.assertEqual(response.status_code, 503)
+        finally:
+            for _ in range(taken):
+                slots.release()
+
+        self.assertEqual(hashing.stats.rejected, 2)
@@ -0,0 +1,42 @@
+from django.core.validators import validate_email
+from django.test import SimpleTestCase
+
+from core.lib import get_fake_profiles, get_random_countries
+from core.models import COUNTRIES, User
+
+
+class RandomCountriesTestCase(SimpleTestCase):
+    def test_count(self):
+        codes = get_random_countries(1000)
+        self.assertEqual(len(codes), 1000)
+        for code in set(codes):
+            self.assertIsNotNone(COUNTRIES.get(code))
+
+    def test_weights(self):
+        codes = get_random_countries(1000, weights={'PK': 9, 'US': 1})
+        self.assertEqual(set(codes), {'PK', 'US'})
+        self.assertGreater(codes.count('PK'), codes.count('US'))
+
+    def test_invalid_weights(self):
+        for weights in [{}, {'PK': 0}, {'XX': 1}, {'PK': 1, 'US': -1}]:
+            with self.assertRaises(ValueError):
+                get_random_countries(10, weights=weights)
+
+
+class FakeProfilesTestCase(SimpleTestCase):
+    def test_profiles(self):
+        profiles = get_fake_profiles(500)
+        self.assertEqual(len(profiles), 500)
+
+        emails = {profile['email'] for profile in profiles}
+        self.assertEqual(len(emails), 500)
+        for profile in profiles:
+            validate_email(profile['email'])
+            self.assertTrue(profile['first_name'])
+            User(**profile)
+
+    def test_seed(self):
+        self.assertEqual(
+            get_fake_profiles(10, seed=1),
+            get_fake_profiles(10, seed=1),
+        )
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import override_settings
+
+from core.mail import MailError, send_messages
+from core.models import User
+from core.tasks import send_verification_email, send_verification_emails
+from core.tests.base import BaseTestCase
+from core.tests.smtp import SMTPSink
+
+
+def build_messages(*recipients):
+    return [
+        EmailMessage('Subject', 'Body', 'from@example.com', [to])
+        for to in recipients
+    ]
+
+
+class SendMessagesTestCase(BaseTestCase):
+    def test_one_connection(self):
+        with SMTPSink() as sink, override_settings(**sink.settings()):
+            send_messages(build_messages(
+                'a@example.com',
+                'b@example.com',
+                'c@example.com',
+            ))
+
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual(len(sink.messages), 3)
+
+    def test_failed_message(self):
+        refused = ['b@example.com']
+        messages = build_messages(
+            'a@example.com',
+            'b@example.com',
+            'c@example.com',
+        )
+        with SMTPSink(refused) as sink, override_settings(**sink.settings()):
+            with self.assertLogs('core.mail', 'ERROR'):
+                with self.assertRaises(MailError) as context:
+                    send_messages(messages)
+
+        self.assertEqual(context.exception.failed, [messages[1]])
+        self.assertEqual(sink.connections, 1)
+        recipients = [to for to, _ in sink.messages]
+        self.assertEqual(recipients, [['a@example.com'], ['c@example.com']])
+
+    def test_unreachable(self):
+        with SMTPSink() as sink:
+            pass
+
+        messages = build_messages('a@example.com', 'b@example.com')
+        with override_settings(**sink.settings()):
+            with self.assertLogs('core.mail', 'ERROR'):
+                with self.assertRaises(MailError) as context:
+                    send_messages(messages)
+
+        self.assertEqual(context.exception.failed, messages)
+
+
+class VerificationTaskTestCase(BaseTestCase):
+    def test_send_verification_email(self):
+        user = User.objects.get(email=self.user)
+        send_verification_email(user.id)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user])
+
+    def test_send_verification_emails(self):
+        users = User.objects.all()
+        with SMTPSink() as sink, override_settings(
+            DEFAULT_FROM_EMAIL='noreply@example.com',
+            **sink.settings(),
+        ):
+            send_verification_emails([user.id for user in users])
+
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual(len(sink.messages), len(users))
+
+    def test_retry_failed(self):
+        users = User.objects.all()
+        refused = User.objects.get(email=self.user)
+        retry = patch.object(
+            send_verification_emails,
+            'retry',
+            side_effect=Retry,
+        )
+        with SMTPSink([self.user]) as sink, override_settings(
+            DEFAULT_FROM_EMAIL='noreply@example.com',
+            **sink.settings(),
+        ), retry as retry, self.assertLogs('core.mail', 'ERROR'):
+            with self.assertRaises(Retry):
+                send_verification_emails([user.id for user in users])
+
+        retry.assert_called_once_with(args=[[refused.id]])
+        self.assertEqual(len(sink.messages), len(users) - 1)
+
+    def test_message(self):
+        user = User.objects.get(email=self.user)
+        user.first_name = 'Tom & Jerry'
+        message = user.build_verification_email()
+
+        self.assertIn('Dear Tom & Jerry,', message.body)
+        self.assertIn(f'/users/{user.id}/email/verification/', message.body)
+        self.assertNotIn('<', message.body)
+
+        html, mimetype = message.alternatives[0]
+        self.assertEqual(mimetype, 'text/html')
+        self.assertIn('Dear Tom &amp; Jerry,', html)
@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+
+from app import celery
+from core import metrics
+from core.tests.base import BaseTestCase
+
+
+@celery.app.task
+def succeed():
+    pass
+
+
+@celery.app.task
+def fail():
+    raise ValueError
+
+
+class HistogramTestCase(BaseTestCase):
+    def test_quantile(self):
+        histogram = metrics.Histogram((1, 2, 5))
+        self.assertIsNone(histogram.quantile(0.5))
+
+        for value in (0.5, 0.5, 1.5, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.quantile(0.4), 1)
+        self.assertEqual(histogram.quantile(0.6), 2)
+        self.assertEqual(histogram.quantile(0.8), 5)
+        self.assertEqual(histogram.quantile(0.99), float('inf'))
+        self.assertEqual(histogram.mean(), 3.1)
+
+    def test_merge(self):
+        first = metrics.TaskStats()
+        first.runtime.observe(0.001)
+        first.succeeded = 1
+        second = metrics.TaskStats(first.as_dict())
+        second.failed = 2
+
+        first.merge(second)
+        self.assertEqual(first.runtime.count, 2)
+        self.assertEqual(first.succeeded, 2)
+        self.assertEqual(first.failed, 2)
+
+
+class TaskMetricsTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.metrics.reset()
+
+    def test_published(self):
+        headers = {}
+        metrics.task_published(
+            sender=succeed.name,
+            body=([1, 2], {}, {}),
+            headers=headers,
+        )
+
+        self.assertAlmostEqual(headers['published_at'], time.time(), 0)
+        stats = metrics.metrics.tasks[succeed.name]
+        self.assertEqual(stats.payload.count, 1)
+
+    def test_tasks(self):
+        succeed.apply()
+        fail.apply()
+
+        stats = metrics.metrics.tasks[succeed.name]
+        self.assertEqual(stats.succeeded, 1)
+        self.assertEqual(stats.runtime.count, 1)
+        self.assertEqual(stats.wait.count, 0)
+        self.assertEqual(metrics.metrics.tasks[fail.name].failed, 1)
+
+    def test_wait(self):
+        # Workers turn the published_at header into a request attribute.
+        succeed.push_request(published_at=time.time() - 0.2)
+        try:
+            metrics.task_started(task_id='1', task=succeed)
+            metrics.task_finished(task_id='1', task=succeed, state='RETRY')
+        finally:
+            succeed.pop_request()
+
+        stats = metrics.metrics.tasks[succeed.name]
+        self.assertEqual(stats.wait.quantile(0.5), 0.25)
+        self.assertEqual(stats.runtime.count, 1)
+        self.assertEqual(stats.retried, 1)
+
+    def test_read_all(self):
+        succeed.apply()
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(TASK_METRICS_DIR=directory):
+                metrics.metrics.write()
+
+            # Another process.
+            with open(os.path.join(directory, '1.json'), 'w') as f:
+                json.dump(metrics.metrics.as_dict(), f)
+
+            tasks = metrics.read_all(directory)
+
+        self.assertEqual(tasks[succeed.name].succeeded, 2)
+        self.assertEqual(tasks[succeed.name].runtime.count, 2)
+
+    def test_command(self):
+        succeed.apply()
+        fail.apply()
+
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(TASK_METRICS_DIR=directory):
+                metrics.metrics.write()
+                call_command('task_metrics', '--reset', stdout=out)
+
+            self.assertEqual(metrics.read_all(directory), {})
+
+        output = out.getvalue()
+        self.assertIn(f'{succeed.name}: count=1 succeeded=1', output)
+        self.assertIn(f'{fail.name}: count=1 succeeded=0 failed=1', output)
+
+    def test_command_without_directory(self):
+        with override_settings(TASK_METRICS_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command('task_metrics')
@@ -0,0 +1,56 @@
+import io
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import transaction
+
+from app import celery
+from core import outbox
+from core.models import OutboxMessage
+from core.tasks import send_verification_email
+from core.tests.base import BaseTestCase
+
+
+class OutboxTestCase(BaseTestCase):
+    def enqueue(self, count):
+        for user_id in range(count):
+            outbox.enqueue(send_verification_email, user_id)
+
+    def test_rollback(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self.enqueue(1)
+                raise ValueError
+
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @patch.object(celery.app, 'send_task')
+    def test_drain(self, send_task):
+        self.enqueue(5)
+        self.assertEqual(outbox.drain(batch_size=2), 5)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+        calls = [call.args for call in send_task.call_args_list]
+        self.assertEqual(calls, [(send_verification_email.name,)] * 5)
+        args = [call.kwargs['args'] for call in send_task.call_args_list]
+        self.assertEqual(args, [[i] for i in range(5)])
+
+    @patch.object(celery.app, 'send_task')
+    def test_broker_failure(self, send_task):
+        self.enqueue(3)
+        send_task.side_effect = [None, ConnectionError]
+        with self.assertLogs('core.outbox', 'ERROR'):
+            self.assertEqual(outbox.drain(), 1)
+
+        remaining = OutboxMessage.objects.order_by('id')
+        self.assertEqual([m.args for m in remaining], [[1], [2]])
+
+    def test_relay_command(self):
+        self.enqueue(2)
+        stdout = io.StringIO()
+        with patch.object(celery.app, 'send_task') as send_task:
+            call_command('relay_outbox', '--once', stdout=stdout)
+
+        self.assertEqual(send_task.call_count, 2)
+        self.assertIn('Published 2 tasks', stdout.getvalue())
+        self.assertFalse(OutboxMessage.objects.exists())
@@ -31,6 +31,7 @@ class LoginTestCase(BaseTestCase):
 
 class UserTestCase(BaseTestCase):
     def setUp(self):
+        super().setUp()
         self.owner = User.objects.create_user(
             email='perm@example.com',
             username='perm@example.com',
@@ -340,3 +341,14 @@ class CountryTestCase(BaseTestCase):
         url = reverse('countries-list')
         response = self.client.get(url)
         self.assertOK(response)
+
+    def test_retrieve_unauth(self):
+        url = reverse('countries-detail', args=['PK'])
+        response = self.client.get(url)
+        self.assert401(response)
+
+    def test_retrieve_auth(self):
+        self.login('owner@example.com')
+        url = reverse('countries-detail', args=['PK'])
+        response = self.client.get(url)
+        self.assertOK(response)
@@ -0,0 +1,141 @@
+import threading
+from unittest.mock import patch
+
+from celery.exceptions import Retry
+from django.core import mail
+from django.test import override_settings
+
+from app import celery
+from core import metrics
+from core.models import User
+from core.tasks import send_verification_email
+from core.tests.base import BaseTestCase
+from core.tests.smtp import SMTPSink
+
+batches = []
+
+
+@celery.app.task(base=celery.BatchTask, batch_size=3, batch_window=0.5)
+def collect(items):
+    batches.append(sorted(items))
+
+
+def worker_calls(task, items):
+    """
+    Call `task` with each of `items` at once, the way the threads of a worker
+    do. Returns what each call raised, or None.
+    """
+    errors = {}
+
+    def call(item):
+        task.push_request(called_directly=False)
+        try:
+            task(item)
+        except Exception as exc:
+            errors[item] = exc
+        else:
+            errors[item] = None
+        finally:
+            task.pop_request()
+
+    threads = [threading.Thread(target=call, args=[item]) for item in items]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return errors
+
+
+class BatchTaskTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        batches.clear()
+
+    def test_direct(self):
+        collect(1)
+        collect.apply(args=[2])
+        self.assertEqual(batches, [[1], [2]])
+
+    def test_batch_size(self):
+        errors = worker_calls(collect, range(6))
+        self.assertEqual(errors, dict.fromkeys(range(6)))
+        self.assertEqual([len(batch) for batch in batches], [3, 3])
+        self.assertEqual(sorted(sum(batches, [])), list(range(6)))
+
+    def test_window(self):
+        worker_calls(collect, [1, 2])
+        self.assertEqual(batches, [[1, 2]])
+
+    def test_failure(self):
+        error = ValueError()
+        run = patch.object(collect, 'run', side_effect=error)
+        retry = patch.object(collect, 'retry', side_effect=Retry)
+        with run, retry as retry, self.assertLogs('app.celery', 'ERROR'):
+            errors = worker_calls(collect, range(3))
+
+        # Every item of the batch is retried, none is acknowledged.
+        self.assertEqual(len(errors), 3)
+        for exc in errors.values():
+            self.assertIsInstance(exc, Retry)
+
+        self.assertEqual(retry.call_count, 3)
+        retry.assert_called_with(exc=error)
+
+        # The next batch starts empty.
+        worker_calls(collect, [3])
+        self.assertEqual(batches, [[3]])
+
+    def test_partial_failure(self):
+        run = patch.object(
+            collect,
+            'run',
+            side_effect=celery.BatchFailed([1]),
+        )
+        retry = patch.object(collect, 'retry', side_effect=Retry)
+        with run, retry as retry:
+            errors = worker_calls(collect, range(3))
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], Retry)
+        self.assertIsNone(errors[2])
+        retry.assert_called_once_with(exc=None)
+
+    def test_metrics(self):
+        metrics.metrics.reset()
+        worker_calls(collect, range(3))
+        with patch.object(collect, 'run', side_effect=ValueError):
+            with patch.object(collect, 'retry', side_effect=Retry):
+                with self.assertLogs('app.celery', 'ERROR'):
+                    worker_calls(collect, range(3))
+
+        stats = metrics.metrics.tasks[f'{collect.name} (batch)']
+        self.assertEqual(stats.runtime.count, 2)
+        self.assertEqual(stats.succeeded, 1)
+        self.assertEqual(stats.failed, 1)
+
+
+class SendVerificationEmailTestCase(BaseTestCase):
+    def test_batch(self):
+        users = list(User.objects.all())
+        for user in users:
+            user.get_email_verification()
+
+        with self.assertNumQueries(1):
+            send_verification_email.run([user.id for user in users])
+
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, sorted(user.email for user in users))
+
+    def test_failed(self):
+        users = User.objects.all()
+        refused = User.objects.get(email=self.user)
+        with SMTPSink([self.user]) as sink, override_settings(
+            DEFAULT_FROM_EMAIL='noreply@example.com',
+            **sink.settings(),
+        ), self.assertLogs('core.mail', 'ERROR'):
+            with self.assertRaises(celery.BatchFailed) as context:
+                send_verification_email.run([user.id for user in users])
+
+        self.assertEqual(context.exception.items, [refused.id])
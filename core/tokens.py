@@ -0,0 +1,97 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from core.models import User
+
+ACCESS_TOKEN_SALT = 'core.tokens.access'
+
+# The claims a signed access token carries. Email and username are included
+# because the permission classes check them on every request.
+ACCESS_TOKEN_FIELDS = [
+    f.attname for f in User._meta.concrete_fields
+    if f.attname in {
+        'id',
+        'username',
+        'email',
+        'is_active',
+        'is_staff',
+        'is_superuser',
+    }
+]
+
+
+class AccessToken:
+    """
+    A decoded, verified access token. This is what `request.auth` holds when
+    a request was authenticated with a signed token instead of a DB token.
+    """
+
+    def __init__(self, key, user_id, issued, expires):
+        self.key = key
+        self.user_id = user_id
+        self.issued = issued
+        self.expires = expires
+
+
+def revoked_key(user_id):
+    return f'auth:token-revoked:{user_id}'
+
+
+def get_revoked(user_id):
+    return cache.get(revoked_key(user_id), 0)
+
+
+def revoke_access_tokens(user_ids):
+    """
+    Invalidate every access token issued so far to the given users.
+
+    Tokens issued at or before the revocation time are rejected. The entry
+    only has to outlive them, so it is kept for one token lifetime (plus a
+    second for the cache's expiry granularity). Each revocation records its
+    own time instead of building on an earlier entry, so one that expired
+    in between can't bring older tokens back.
+    """
+    revoked = time.time()
+    cache.set_many(
+        {revoked_key(user_id): revoked for user_id in user_ids},
+        timeout=settings.ACCESS_TOKEN_LIFETIME + 1,
+    )
+
+
+def issue_access_token(user):
+    issued = time.time()
+    expires = int(issued) + settings.ACCESS_TOKEN_LIFETIME
+    claims = [getattr(user, name) for name in ACCESS_TOKEN_FIELDS]
+    payload = [claims, issued, expires]
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def is_access_token(key):
+    # DB tokens are 40 hex characters, signed tokens always contain the
+    # signer separator.
+    return ':' in key
+
+
+def read_access_token(key):
+    """
+    Verify a signed access token and return `(user, AccessToken)`, or `None`
+    if it is forged, expired or revoked. Only the revocation lookup touches
+    the cache, the DB is never queried.
+    """
+    try:
+        claims, issued, expires = signing.loads(key, salt=ACCESS_TOKEN_SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+    if expires < time.time():
+        return None
+
+    user = User.from_db(DEFAULT_DB_ALIAS, ACCESS_TOKEN_FIELDS, claims)
+    if issued <= get_revoked(user.id):
+        return None
+
+    return user, AccessToken(key, user.id, issued, expires)
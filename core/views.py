@@ -1,40 +1,165 @@
+import functools
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from rest_framework import permissions, status, viewsets
 from rest_framework.authtoken import views as authtoken_views
+from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from core.models import COUNTRIES, User
+from core import outbox
+from core.bulk import create_users, update_users
+from core.exports import stream_csv, stream_ndjson
+from core.fastserializers import ListPlan
+from core.filters import TrigramSearchFilter
+from core.models import COUNTRIES, EmailVerification, User
+from core.pagination import EstimatedCountPagination, KeysetPagination
+from core.parsers import NDJSONParser
 from core.permissions import (
     IsDefaultUser,
     IsNotDefaultUser,
+    IsTokenAuthenticated,
     SignupPermission,
     UserPermission,
 )
+from core.responses import (
+    PrecomputedJSON,
+    user_detail_cache,
+    user_detail_variant,
+)
 from core.serializers import (
+    BulkUpdateSerializer,
     EmptySerializer,
     SignupSerializer,
     UserAdminSerializer,
+    UserExportSerializer,
     UserSerializer,
+    UserTargetSerializer,
 )
+from core.tasks import send_verification_email
+from core.tokens import issue_access_token
 
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
+    pagination_class = EstimatedCountPagination
+    filter_backends = [TrigramSearchFilter]
+    search_fields = ['email', 'first_name', 'last_name']
+    empty_serializer_actions = [
+        'admin',
+        'bulk_admin',
+        'bulk_create',
+        'export',
+        'start_email_verification',
+    ]
     permission_classes = [
         permissions.IsAuthenticated,
         IsNotDefaultUser,
         UserPermission,
     ]
 
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination when the client asks for it with
+        `?pagination=cursor` or follows a cursor link.
+        """
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            params = request.query_params if request else {}
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+
+        return super().paginator
+
+    def list(self, request, *args, **kwargs):
+        # date_joined is read by the keyset paginator.
+        plan = ListPlan.compile(self.get_serializer(), ['date_joined'])
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+
+        return Response(plan.render(queryset))
+
+    def retrieve(self, request, *args, **kwargs):
+        key = self.get_detail_cache_key()
+        if key is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        pk, variant = key
+        body, version = user_detail_cache.get(pk, variant)
+        if body is None:
+            serializer = self.get_serializer(self.get_object())
+            body = request.accepted_renderer.render(
+                serializer.data,
+                request.accepted_media_type,
+                self.get_renderer_context(),
+            )
+            user_detail_cache.set(pk, version, variant, body)
+
+        return HttpResponse(body, content_type=request.accepted_media_type)
+
+    def get_detail_cache_key(self):
+        """
+        Return the user id and what else the cached detail response depends
+        on, or None if this request can't use the cache.
+
+        Permissions are checked here, before the cache is read: only staff
+        and the user themselves may see a user.
+        """
+        request = self.request
+        params = request.query_params
+        if request.accepted_renderer.format != 'json':
+            return None
+        if set(params) - {'fields', 'exclude'}:
+            return None
+
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        if not pk.isdigit():
+            return None
+
+        # Versions are bumped by id, so '05' has to share the entries of 5.
+        pk = int(pk)
+        if not request.user.is_staff and request.user.id != pk:
+            return None
+
+        return pk, user_detail_variant(
+            self.get_serializer_class(),
+            request.accepted_media_type,
+            request,
+        )
+
     @action(
         detail=True,
         methods=['post'],
         url_path=r'email/verification/',
     )
     def start_email_verification(self, request, *args, **kwargs):
+        """
+        Queue a verification email. Requests repeated within
+        `EMAIL_VERIFICATION_DEDUPE_WINDOW` seconds don't queue another one.
+        """
         user = self.get_object()
-        user.send_verification_email()
-        return Response(status=200)
+        key = f'email-verification:sent:{user.id}'
+        window = settings.EMAIL_VERIFICATION_DEDUPE_WINDOW
+        if cache.add(key, True, window):
+            try:
+                outbox.enqueue(send_verification_email, user.id)
+            except Exception:
+                # Nothing was queued, the next request may try again.
+                cache.delete(key)
+                raise
+
+        return Response(status=status.HTTP_202_ACCEPTED)
 
     @action(
         detail=False,
@@ -51,9 +176,12 @@ class UserViewSet(viewsets.ModelViewSet):
         url_path=r'email/verification/(?P<code>\w+)',
     )
     def complete_email_verification(self, request, *args, **kwargs):
-        user = self.get_object()
-        code = kwargs['code']
-        user.verify_email(code)
+        pk = kwargs['pk']
+        if not pk.isdigit():
+            raise Http404
+
+        if not EmailVerification.verify_code(int(pk), kwargs['code']):
+            raise Http404
 
         headers = self.get_success_headers(kwargs)
         return Response(
@@ -77,10 +205,128 @@ class UserViewSet(viewsets.ModelViewSet):
             headers=headers,
         )
 
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAdminUser],
+        parser_classes=[JSONParser, NDJSONParser],
+        url_path='bulk',
+    )
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Create users from a JSON array or an NDJSON stream of signups. Every
+        row gets a result, failed rows don't stop the others. Requests with
+        more than `BULK_CREATE_MAX_ROWS` rows are rejected before any user
+        is created.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError('Expected a list of users.')
+
+        limit = settings.BULK_CREATE_MAX_ROWS
+        if len(rows) > limit:
+            raise ValidationError(
+                f'At most {limit} users can be created per request.',
+            )
+
+        results = create_users(rows)
+        created = sum(result['status'] == 'created' for result in results)
+        return Response({
+            'created': created,
+            'failed': len(results) - created,
+            'results': results,
+        })
+
+    @action(
+        detail=False,
+        methods=['patch'],
+        url_path='bulk/update',
+    )
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Partially update many users. The body is a change set or a list of
+        them, each selecting users with `ids` and filters and giving the
+        fields to set in `data`. Every change set is a single UPDATE.
+        """
+        changes = request.data
+        if isinstance(changes, dict):
+            changes = [changes]
+
+        context = self.get_serializer_context()
+        context['serializer_class'] = self.get_serializer_class()
+        serializer = BulkUpdateSerializer(
+            data=changes,
+            many=True,
+            context=context,
+        )
+        serializer.is_valid(raise_exception=True)
+
+        updates = []
+        for change in serializer.validated_data:
+            values = change.pop('data')
+            updates.append((change, values))
+
+        counts = update_users(self.get_queryset(), updates)
+        return Response({'updated': sum(counts), 'counts': counts})
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAdminUser],
+        url_path='bulk/admin',
+    )
+    def bulk_admin(self, request, *args, **kwargs):
+        """
+        Make all the selected users staff with a single UPDATE.
+        """
+        serializer = UserTargetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        change = (serializer.validated_data, {'is_staff': True})
+        counts = update_users(self.get_queryset(), [change])
+        return Response({'updated': counts[0]})
+
+    @action(
+        detail=False,
+        methods=['get'],
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def export(self, request, *args, **kwargs):
+        """
+        Stream all users as NDJSON or CSV. Rows are read through a server side
+        cursor, so memory use doesn't grow with the number of users.
+        """
+        serializer = UserExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        queryset = self.get_queryset()
+        if 'joined_after' in params:
+            queryset = queryset.filter(date_joined__gte=params['joined_after'])
+        if 'joined_before' in params:
+            queryset = queryset.filter(date_joined__lt=params['joined_before'])
+
+        fields = params.get('fields') or UserExportSerializer.FIELDS
+        rows = queryset.values_list(*fields).iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        )
+
+        if params['type'] == 'csv':
+            content = stream_csv(fields, rows)
+            content_type = 'text/csv'
+        else:
+            content = stream_ndjson(fields, rows)
+            content_type = 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        filename = f'users.{params["type"]}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     def get_serializer_class(self):
         if self.action == 'signup':
             return SignupSerializer
-        elif self.action in ['admin', 'start_email_verification']:  # pragma: no cover  # noqa
+        elif self.action in self.empty_serializer_actions:  # pragma: no cover
             # This block is for swagger documentation. It will not be used by
             # the code. Hence, the no-cover.
             return EmptySerializer
@@ -93,28 +339,83 @@ class UserViewSet(viewsets.ModelViewSet):
         user = self.request.user
         queryset = super().get_queryset()
 
-        if self.action == 'complete_email_verification':
-            return queryset
-
         if not user.is_staff:
             queryset = queryset.filter(id=user.id)
 
-        return queryset.order_by('-date_joined')
+        params = self.request.query_params
+        is_read = self.action in ['list', 'retrieve']
+        if is_read and ('fields' in params or 'exclude' in params):
+            # Only load the columns the trimmed serializer reads. The id and
+            # date_joined are always needed for lookups and pagination.
+            columns = self.get_serializer().get_source_columns()
+            queryset = queryset.only('id', 'date_joined', *columns)
+
+        return queryset.order_by('-date_joined', '-id')
+
+
+def access_token_response(user, **extra):
+    return Response({
+        'access': issue_access_token(user),
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME,
+        **extra,
+    })
 
 
 class ObtainAuthToken(authtoken_views.ObtainAuthToken):
     permission_classes = [IsDefaultUser]
 
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user)
+        return access_token_response(user, token=token.key)
+
+
+class RefreshAccessToken(APIView):
+    """
+    Issue a new signed access token. The request has to be authenticated
+    with the DB token returned by /login/.
+    """
+    permission_classes = [IsTokenAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        return access_token_response(request.user)
+
+
+def serialize_country(country):
+    return dict(
+        code=country.code,
+        name=country.name,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def country_list():
+    # The list only changes with pycountry, so build it once per process.
+    return PrecomputedJSON([serialize_country(c) for c in COUNTRIES])
+
+
+@functools.lru_cache(maxsize=2048)
+def country_search(query):
+    # Autocomplete widgets send the same few prefixes over and over.
+    countries = COUNTRIES.search(query)
+    return PrecomputedJSON([serialize_country(c) for c in countries])
+
 
 class CountryViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def list(self, request, *args, **kwargs):
-        countries = []
-        for code, name in sorted(COUNTRIES, key=lambda x: x[1]):
-            countries.append(dict(
-                code=code,
-                name=name,
-            ))
-
-        return Response(countries)
+        query = request.query_params.get('q', '').strip().lower()
+        if query:
+            return country_search(query).as_response(request)
+
+        return country_list().as_response(request)
+
+    def retrieve(self, request, pk=None):
+        country = COUNTRIES.get(pk)
+        if country is None:
+            raise Http404
+
+        return Response(serialize_country(country))
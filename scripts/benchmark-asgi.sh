@@ -0,0 +1,37 @@
+#!/usr/bin/env bash
+# Compare run-with-gunicorn.sh (sync workers) with run-with-uvicorn.sh
+# (uvicorn workers) on the same read endpoints under concurrent connections.
+# The ASGI run also loads the async views under /async/.
+# Usage: ./scripts/benchmark-asgi.sh <access token> <user id> [workers] [connections]
+token=$1
+user=$2
+workers=${3:-2}
+connections=${4:-64}
+socket=${SOCKET:-/dev/shm/benchmark.sock}
+
+serve() {
+    rm -f $socket
+    gunicorn -w $workers --worker-tmp-dir /dev/shm --bind unix:$socket "$@" 2> /dev/null &
+    server=$!
+    while [ ! -S $socket ]; do sleep 0.1; done
+    sleep 1
+}
+
+load() {
+    for path in "$@"; do
+        python scripts/load.py --unix $socket -c $connections -d ${DURATION:-10} \
+            -H "Authorization: Bearer $token" $path
+    done
+}
+
+paths=(/countries/PK/ "/countries/?q=pa" /users/$user/ /users/)
+
+echo "sync: $workers workers, 4 threads each"
+serve --threads 4 app.wsgi:application
+load "${paths[@]}"
+kill $server; wait $server
+
+echo "asgi: $workers uvicorn workers"
+DEBUG_TOOLBAR=off serve -k uvicorn.workers.UvicornWorker app.asgi:application
+load "${paths[@]}" "${paths[@]/#//async}"
+kill $server; wait $server
@@ -0,0 +1,2 @@
+#!/usr/bin/env bash
+./manage.py test --keepdb --tag benchmark "${@:1}"
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Keep-alive HTTP load over a number of concurrent connections.
+
+    ./scripts/load.py --unix /dev/shm/gunicorn.sock -c 64 -d 10 \
+        -H 'Authorization: Bearer <token>' /countries/PK/
+"""
+import argparse
+import asyncio
+import time
+
+
+async def request(reader, writer, head):
+    writer.write(head)
+    await writer.drain()
+
+    status = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+
+        name, _, value = line.decode('latin1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+
+    await reader.readexactly(length)
+    return int(status.split()[1])
+
+
+async def connection(args, head, deadline, latencies, errors):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        host, _, port = args.host.partition(':')
+        reader, writer = await asyncio.open_connection(host, int(port or 80))
+
+    try:
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            status = await request(reader, writer, head)
+            latencies.append(time.monotonic() - start)
+            if status >= 300:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def main(args):
+    lines = [f'GET {args.path} HTTP/1.1', 'Host: localhost', *args.header]
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin1')
+    latencies = []
+    errors = []
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        connection(args, head, deadline, latencies, errors)
+        for _ in range(args.connections)
+    ])
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    count = len(latencies)
+    print(
+        f'{args.path}: {count} requests, {count / elapsed:.0f} req/s, '
+        f'p50={latencies[count // 2] * 1000:.1f}ms '
+        f'p99={latencies[int(count * 0.99)] * 1000:.1f}ms '
+        f'errors={len(errors)}'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('path')
+    parser.add_argument('--unix', help='Unix socket of the server.')
+    parser.add_argument('--host', default='localhost:8000')
+    parser.add_argument('-c', '--connections', type=int, default=64)
+    parser.add_argument('-d', '--duration', type=float, default=10)
+    parser.add_argument('-H', '--header', action='append', default=[])
+    asyncio.run(main(parser.parse_args()))
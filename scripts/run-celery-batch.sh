@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+# Batch tasks wait for their batch to run, so the worker needs at least as
+# many threads as the largest batch size.
+celery -A app.celery worker -l INFO -P threads -c 50 -Q batch
@@ -1,2 +1,4 @@
 #!/usr/bin/env bash
-celery -A app.celery worker -l INFO -Q 2 -Q default
+# -B runs the beat scheduler that drains the outbox. Only one worker may run
+# it, use ./manage.py relay_outbox instead when there are more.
+celery -A app.celery worker -B -l INFO -Q 2 -Q default
@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Serve app.asgi with uvicorn workers, the async views are under /async/.
+# The debug toolbar middleware would run every request in a thread.
+export DEBUG_TOOLBAR=off
+python manage.py migrate
+python manage.py collectstatic --noinput
+gunicorn -w $1 -k uvicorn.workers.UvicornWorker --worker-tmp-dir /dev/shm app.asgi:application --bind unix:/dev/shm/gunicorn.sock
@@ -1,2 +1,2 @@
 #!/usr/bin/env bash
-./manage.py test --keepdb "${@:1}"
+./manage.py test --keepdb --exclude-tag benchmark "${@:1}"